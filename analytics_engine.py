@@ -0,0 +1,245 @@
+from datetime import date, timedelta
+from typing import Dict, Optional
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from models import COMPLETED_ORDER_STATUS
+from periods import period_dates, day_range, TREND_WINDOWS
+
+# One row per order line of a completed order. tip_amount is the order's tip, repeated
+# on each of its lines, so it is summed over distinct orders only.
+ORDER_LINES_QUERY = f"""
+    SELECT o.id AS order_id, o.created_at, o.staff_id, s.name AS staff_name,
+           COALESCE(o.tip_amount, 0) AS tip_amount,
+           mi.name AS item_name, COALESCE(mi.category, 'Food') AS category,
+           oi.qty AS quantity, mi.price AS unit_price
+    FROM tablelink_orders o
+    JOIN tablelink_order_items oi ON oi.order_id = o.id
+    JOIN tablelink_menu_items mi ON mi.id = oi.product_id
+    LEFT JOIN tablelink_staff s ON s.id = o.staff_id
+    WHERE o.hotel_id = :hotel_id AND o.status = '{COMPLETED_ORDER_STATUS}'
+      AND o.created_at >= :start AND o.created_at < :end
+"""
+
+COLUMN_TYPES = {
+    "order_id": "int64",
+    "staff_id": "Int64",  # nullable
+    "staff_name": "string",
+    "tip_amount": "float64",
+    "item_name": "string",
+    "category": "string",
+    "quantity": "int64",
+    "unit_price": "float64"
+}
+
+def load_order_lines(db: Session, hotel_id: int, start_date: date, end_date: date,
+                     staff_id: int = None, item_name: str = None) -> pd.DataFrame:
+    """Order lines of the hotel's completed orders on the days start_date..end_date, in one query.
+
+    staff_id and item_name narrow the query to one staff member's orders or
+    one menu item's lines. Columns are typed as in COLUMN_TYPES plus
+    created_at (datetime64), day (created_at at midnight) and revenue
+    (quantity * unit_price).
+    """
+    query = ORDER_LINES_QUERY + (" AND o.staff_id = :staff_id" if staff_id else "")
+    query += " AND mi.name = :item_name" if item_name is not None else ""
+    start, end = day_range(start_date, end_date)
+    result = db.execute(text(query), {"hotel_id": hotel_id, "start": start, "end": end, "staff_id": staff_id,
+                                      "item_name": item_name})
+    frame = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+    frame = frame.astype(COLUMN_TYPES)
+    # Raw SQLite rows return timestamps as strings
+    frame["created_at"] = pd.to_datetime(frame["created_at"], format="ISO8601")
+    frame["day"] = frame["created_at"].dt.normalize()
+    frame["revenue"] = frame["quantity"] * frame["unit_price"]
+    return frame
+
+def _orders(lines: pd.DataFrame) -> pd.DataFrame:
+    """One row per order: staff, day, tip, revenue and item count"""
+    return lines.groupby("order_id", sort=False).agg(
+        staff_id=("staff_id", "first"),
+        staff_name=("staff_name", "first"),
+        day=("day", "first"),
+        tip_amount=("tip_amount", "first"),
+        revenue=("revenue", "sum"),
+        quantity=("quantity", "sum")
+    )
+
+def _daily_series(orders: pd.DataFrame, first_day: date, last_day: date) -> pd.DataFrame:
+    """orders/revenue per day for first_day..last_day, days without orders filled with zeros"""
+    days = pd.date_range(first_day, last_day, freq="D")
+    in_window = orders[(orders["day"] >= days[0]) & (orders["day"] <= days[-1])]
+    daily = in_window.set_index("day").resample("D").agg({"revenue": "sum", "quantity": "size"})
+    daily = daily.rename(columns={"quantity": "orders"}).reindex(days, fill_value=0)
+    return daily
+
+def _summary(orders: pd.DataFrame) -> dict:
+    return {
+        "total_orders": int(len(orders)),
+        "total_sales": float(orders["revenue"].sum()),
+        "total_tips": float(orders["tip_amount"].sum())
+    }
+
+def _top_items(lines: pd.DataFrame, limit: int) -> pd.DataFrame:
+    items = lines.groupby(["item_name", "category"], sort=False).agg(
+        quantity_sold=("quantity", "sum"),
+        revenue=("revenue", "sum"),
+        orders_appeared_in=("order_id", "nunique"),
+        avg_price=("unit_price", "mean")
+    ).reset_index()
+    return items.nlargest(limit, "quantity_sold", keep="first")
+
+def _categories(lines: pd.DataFrame) -> pd.DataFrame:
+    categories = lines.groupby("category", sort=False).agg(
+        quantity_sold=("quantity", "sum"),
+        revenue=("revenue", "sum"),
+        unique_items=("item_name", "nunique"),
+        orders_count=("order_id", "nunique"),
+        avg_item_price=("unit_price", "mean")
+    ).reset_index().sort_values("revenue", ascending=False)
+    total_revenue = categories["revenue"].sum()
+    total_quantity = categories["quantity_sold"].sum()
+    categories["revenue_percentage"] = categories["revenue"] / total_revenue * 100 if total_revenue > 0 else 0.0
+    categories["quantity_percentage"] = (categories["quantity_sold"] / total_quantity * 100
+                                         if total_quantity > 0 else 0.0)
+    categories["avg_revenue_per_order"] = categories["revenue"] / categories["orders_count"].clip(lower=1)
+    return categories
+
+def _staff(orders: pd.DataFrame) -> pd.DataFrame:
+    staff = orders.dropna(subset=["staff_id"]).groupby(["staff_id", "staff_name"], sort=False).agg(
+        total_orders=("revenue", "size"),
+        total_sales=("revenue", "sum"),
+        total_tips=("tip_amount", "sum"),
+        total_items=("quantity", "sum")
+    ).reset_index().sort_values("total_sales", ascending=False)
+    staff["avg_order_value"] = staff["total_sales"] / staff["total_orders"].clip(lower=1)
+    return staff
+
+def _records(frame: pd.DataFrame, columns: Dict[str, type]) -> list:
+    """frame rows as dicts of plain Python values (JSON-serializable)"""
+    return [
+        {name: cast(value) for (name, cast), value in zip(columns.items(), row)}
+        for row in frame[list(columns)].itertuples(index=False, name=None)
+    ]
+
+def period_analytics(db: Session, hotel_id: int, target_date: date, period: str = "day",
+                     staff_id: int = None, trend_days: int = 7) -> dict:
+    """Dashboard analytics (summary, top items, categories, trend, staff) for the period containing
+    target_date, computed from a single DataFrame of order lines.
+
+    Raises ValueError for a trend_days not in TREND_WINDOWS; query errors are
+    returned as an empty result with an "error" key.
+    """
+    if trend_days not in TREND_WINDOWS:
+        raise ValueError(f"trend_days must be one of {', '.join(map(str, TREND_WINDOWS))}")
+    try:
+        return _period_analytics(db, hotel_id, target_date, period, staff_id, trend_days)
+    except Exception as e:
+        print(f"Analytics error: {e}")
+        return {
+            "summary": {"total_orders": 0, "total_sales": 0, "total_tips": 0},
+            "top_items": [],
+            "categories": [],
+            "trends": [],
+            "waiters": [],
+            "error": str(e)
+        }
+
+def _period_analytics(db: Session, hotel_id: int, target_date: date, period: str, staff_id: Optional[int],
+                      trend_days: int) -> dict:
+    start_date, end_date = period_dates(period, target_date, year_to_date=True)
+    trend_start = target_date - timedelta(days=trend_days - 1)
+    lines = load_order_lines(db, hotel_id, min(start_date, trend_start), max(end_date, target_date), staff_id)
+
+    all_orders = _orders(lines)
+    in_period = (lines["day"] >= pd.Timestamp(start_date)) & (lines["day"] <= pd.Timestamp(end_date))
+    period_lines = lines[in_period]
+    period_orders = all_orders[(all_orders["day"] >= pd.Timestamp(start_date))
+                               & (all_orders["day"] <= pd.Timestamp(end_date))]
+    daily = _daily_series(all_orders, trend_start, target_date)
+
+    return {
+        "summary": _summary(period_orders),
+        "top_items": _records(_top_items(period_lines, 10).rename(columns={"item_name": "name"}),
+                              {"name": str, "quantity_sold": int, "revenue": float, "category": str}),
+        "categories": _records(_categories(period_lines),
+                               {"category": str, "quantity_sold": int, "revenue": float}),
+        "trends": [
+            {"date": day.date().isoformat(), "orders": int(orders), "revenue": float(revenue)}
+            for day, orders, revenue in zip(daily.index, daily["orders"], daily["revenue"])
+        ],
+        "waiters": _records(_staff(period_orders).rename(columns={"staff_name": "name"}),
+                            {"name": str, "total_orders": int, "total_sales": float, "total_tips": float,
+                             "total_items": int, "avg_order_value": float})
+    }
+
+def top_items(db: Session, hotel_id: int, target_date: date, period: str = "day", limit: int = 10,
+              staff_id: int = None) -> dict:
+    start_date, end_date = period_dates(period, target_date, year_to_date=True)
+    lines = load_order_lines(db, hotel_id, start_date, end_date, staff_id)
+    items = _top_items(lines, limit)
+    items["avg_revenue_per_order"] = items["revenue"] / items["orders_appeared_in"].clip(lower=1)
+    return {
+        "period": period,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "summary": {
+            "total_orders": int(lines["order_id"].nunique()),
+            "total_revenue": float(lines["revenue"].sum()),
+            "unique_items_sold": int(lines["item_name"].nunique()),
+            "top_items_count": int(len(items))
+        },
+        "top_items": _records(items.rename(columns={"item_name": "name"}), {
+            "name": str, "category": str, "quantity_sold": int, "revenue": float,
+            "orders_appeared_in": int, "avg_price": float, "avg_revenue_per_order": float
+        })
+    }
+
+def category_comparison(db: Session, hotel_id: int, target_date: date, period: str = "month",
+                        staff_id: int = None) -> dict:
+    start_date, end_date = period_dates(period, target_date, year_to_date=True)
+    categories = _categories(load_order_lines(db, hotel_id, start_date, end_date, staff_id))
+    return {
+        "period": period,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "summary": {
+            "total_categories": int(len(categories)),
+            "total_revenue": float(categories["revenue"].sum()),
+            "total_quantity": int(categories["quantity_sold"].sum())
+        },
+        "categories": _records(categories, {
+            "category": str, "quantity_sold": int, "revenue": float, "unique_items": int,
+            "orders_count": int, "avg_item_price": float, "revenue_percentage": float,
+            "quantity_percentage": float, "avg_revenue_per_order": float
+        })
+    }
+
+def item_performance_trends(db: Session, hotel_id: int, item_name: str, days: int = 30,
+                            end_date: Optional[date] = None) -> dict:
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+    item_lines = load_order_lines(db, hotel_id, start_date, end_date, item_name=item_name)
+
+    calendar = pd.date_range(start_date, end_date, freq="D")
+    daily = item_lines.set_index("day").resample("D").agg(
+        {"quantity": "sum", "revenue": "sum", "order_id": "nunique"}
+    ).reindex(calendar, fill_value=0)
+
+    total_quantity = int(daily["quantity"].sum())
+    total_revenue = float(daily["revenue"].sum())
+    return {
+        "item_name": item_name,
+        "period_days": days,
+        "summary": {
+            "total_quantity": total_quantity,
+            "total_revenue": total_revenue,
+            "active_days": int((daily["quantity"] > 0).sum()),
+            "avg_daily_quantity": total_quantity / days if days > 0 else 0,
+            "avg_daily_revenue": total_revenue / days if days > 0 else 0
+        },
+        "daily_trends": [
+            {"date": day.date().isoformat(), "quantity": int(quantity), "revenue": float(revenue), "orders": int(orders)}
+            for day, quantity, revenue, orders in zip(daily.index, daily["quantity"], daily["revenue"], daily["order_id"])
+        ]
+    }
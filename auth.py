@@ -1,4 +1,9 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import threading
+import time
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -6,4 +11,95 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+# bcrypt is deliberately slow (~100-300ms per call), so async handlers must not run it
+# on the event loop. It runs on its own small pool; once AUTH_MAX_PENDING calls are
+# queued or running, new ones are refused instead of piling up behind a login storm.
+HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_PENDING = int(os.getenv("AUTH_MAX_PENDING", str(HASH_WORKERS * 8)))
+
+hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+class AuthQueueFull(Exception):
+    """Raised when the password hashing pool already has MAX_PENDING calls queued or running"""
+
+class _HashPoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pending = 0  # queued + running
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def admit(self) -> bool:
+        with self._lock:
+            if self.pending >= MAX_PENDING:
+                self.rejected += 1
+                return False
+            self.pending += 1
+            return True
+
+    def started(self, queued_at: float) -> float:
+        now = time.monotonic()
+        wait = now - queued_at
+        with self._lock:
+            self.running += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        return now
+
+    def finished(self, started_at: float):
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+            self.total_run += time.monotonic() - started_at
+
+    def release(self):
+        with self._lock:
+            self.pending -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "workers": HASH_WORKERS,
+                "max_pending": MAX_PENDING,
+                "pending": self.pending,
+                "queued": self.pending - self.running,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "avg_run_ms": round(self.total_run / self.completed * 1000, 2) if self.completed else 0.0
+            }
+
+hash_pool_stats = _HashPoolStats()
+
+async def _run_on_hash_pool(func, *args):
+    if not hash_pool_stats.admit():
+        raise AuthQueueFull()
+    queued_at = time.monotonic()
+
+    def timed_call():
+        # Released here rather than in the awaiting coroutine: a cancelled request
+        # does not stop a queued call, which still occupies the pool
+        started_at = hash_pool_stats.started(queued_at)
+        try:
+            return func(*args)
+        finally:
+            hash_pool_stats.finished(started_at)
+            hash_pool_stats.release()
+
+    return await asyncio.get_running_loop().run_in_executor(hash_executor, timed_call)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bounded hashing pool. Raises AuthQueueFull when saturated."""
+    return await _run_on_hash_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bounded hashing pool. Raises AuthQueueFull when saturated."""
+    return await _run_on_hash_pool(get_password_hash, password)
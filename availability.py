@@ -0,0 +1,211 @@
+import bisect
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from cache import TTLCache
+
+# Bookings in these states hold their room for the nights [check_in, check_out)
+BLOCKING_STATUSES = ("pending", "confirmed", "checked_in")
+
+def day_number(value) -> int:
+    """Date ordinal of a date, datetime or ISO string (raw SQLite rows come back as strings)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+class RoomCalendar:
+    """Booked [start, end) day intervals of one room, sorted by start day.
+
+    max_ends[i] is the latest end among the first i+1 intervals, so "does any
+    booking overlap [start, end)" is one bisect: only intervals starting
+    before end can overlap, and one of them does iff the latest of their
+    ends is after start.
+    """
+
+    __slots__ = ("starts", "ends", "booking_ids", "max_ends")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.booking_ids: List[int] = []
+        self.max_ends: List[int] = []
+
+    def is_free(self, start: int, end: int) -> bool:
+        i = bisect.bisect_left(self.starts, end)
+        return i == 0 or self.max_ends[i - 1] <= start
+
+    def add(self, booking_id: int, start: int, end: int):
+        self.remove(booking_id)
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.booking_ids.insert(i, booking_id)
+        self._rebuild_max_ends(i)
+
+    def remove(self, booking_id: int) -> bool:
+        try:
+            i = self.booking_ids.index(booking_id)
+        except ValueError:
+            return False
+        del self.starts[i], self.ends[i], self.booking_ids[i]
+        self._rebuild_max_ends(i)
+        return True
+
+    def _rebuild_max_ends(self, i: int):
+        del self.max_ends[i:]
+        running = self.max_ends[-1] if self.max_ends else 0
+        for end in self.ends[i:]:
+            running = max(running, end)
+            self.max_ends.append(running)
+
+class HotelAvailability:
+    """Per room type calendars for one hotel, built from tablelink_room_bookings"""
+
+    def __init__(self):
+        self.rooms_by_type: Dict[str, List[int]] = {}  # room ids in room_number order
+        self.calendars: Dict[int, RoomCalendar] = {}
+
+    def add_room(self, room_id: int, room_type: str):
+        self.rooms_by_type.setdefault(room_type, []).append(room_id)
+        self.calendars[room_id] = RoomCalendar()
+
+    def free_rooms(self, room_type: str, check_in, check_out) -> List[int]:
+        """Rooms of room_type with no blocking booking overlapping [check_in, check_out)"""
+        start, end = day_number(check_in), day_number(check_out)
+        return [room_id for room_id in self.rooms_by_type.get(room_type, ())
+                if self.calendars[room_id].is_free(start, end)]
+
+    def count_free(self, room_type: str, check_in, check_out) -> int:
+        return len(self.free_rooms(room_type, check_in, check_out))
+
+    def add_booking(self, room_id: int, booking_id: int, check_in, check_out):
+        calendar = self.calendars.get(room_id)
+        if calendar is not None:
+            calendar.add(booking_id, day_number(check_in), day_number(check_out))
+
+    def remove_booking(self, room_id: int, booking_id: int):
+        calendar = self.calendars.get(room_id)
+        if calendar is not None:
+            calendar.remove(booking_id)
+
+# hotel_id -> HotelAvailability. Kept current by record_booking()/release_booking() in
+# this process; the TTL bounds how long another worker's bookings can go unseen.
+availability_cache = TTLCache(
+    max_entries=int(os.getenv("AVAILABILITY_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("AVAILABILITY_CACHE_TTL", "60"))
+)
+
+def build_hotel_availability(db: Session, hotel_id: int) -> HotelAvailability:
+    availability = HotelAvailability()
+    rooms = db.execute(text("""
+        SELECT id, room_type FROM tablelink_rooms
+        WHERE hotel_id = :hotel_id AND room_type IS NOT NULL
+        ORDER BY room_number
+    """), {"hotel_id": hotel_id}).fetchall()
+    for room in rooms:
+        availability.add_room(room.id, room.room_type)
+
+    # Stays that ended before today can no longer conflict with a new booking
+    bookings = db.execute(text(f"""
+        SELECT id, room_id, check_in_date, check_out_date FROM tablelink_room_bookings
+        WHERE hotel_id = :hotel_id AND check_out_date > :today
+          AND status IN ({", ".join(f"'{status}'" for status in BLOCKING_STATUSES)})
+    """), {"hotel_id": hotel_id, "today": datetime.combine(date.today(), datetime.min.time())}).fetchall()
+    for booking in bookings:
+        availability.add_booking(booking.room_id, booking.id, booking.check_in_date, booking.check_out_date)
+    return availability
+
+def get_hotel_availability(db: Session, hotel_id: int) -> HotelAvailability:
+    return availability_cache.get_or_load(hotel_id, lambda: build_hotel_availability(db, hotel_id))
+
+def _has_overlapping_booking(db: Session, room_id: int, check_in, check_out) -> bool:
+    return db.execute(text(f"""
+        SELECT 1 FROM tablelink_room_bookings
+        WHERE room_id = :room_id AND check_in_date < :check_out AND check_out_date > :check_in
+          AND status IN ({", ".join(f"'{status}'" for status in BLOCKING_STATUSES)})
+        LIMIT 1
+    """), {"room_id": room_id, "check_in": check_in, "check_out": check_out}).first() is not None
+
+def allocate_room(db: Session, hotel_id: int, room_type: str, check_in, check_out):
+    """Pick and lock a room of room_type free for [check_in, check_out); None when sold out.
+
+    The caller inserts the booking in the same transaction and commits, which
+    releases the lock. The in-memory index only proposes candidates: each one
+    is re-checked against tablelink_room_bookings while locked, so an index
+    that is stale (e.g. another worker just booked) can never overbook.
+
+    PostgreSQL: exactly one free candidate is row-locked, with FOR UPDATE
+    SKIP LOCKED, so concurrent bookers each take a different room instead of
+    queueing on one or seeing every free room as taken.
+    SQLite has a single writer anyway: taking the write lock up front (a no-op
+    UPDATE) serializes allocations across processes.
+    """
+    candidates = get_hotel_availability(db, hotel_id).free_rooms(room_type, check_in, check_out)
+    if not candidates:
+        return None
+
+    if db.bind.dialect.name == "postgresql":
+        room_id = _lock_free_room(db, candidates, check_in, check_out)
+        if room_id is not None:
+            return room_id
+    else:
+        db.execute(text("UPDATE tablelink_hotels SET rooms_version = rooms_version WHERE id = :hotel_id"),
+                   {"hotel_id": hotel_id})
+        for room_id in candidates:
+            if not _has_overlapping_booking(db, room_id, check_in, check_out):
+                return room_id
+
+    # Every candidate was taken behind this index's back: reload it on the next request
+    invalidate_availability(hotel_id)
+    return None
+
+def _lock_free_room(db: Session, candidates: List[int], check_in, check_out) -> Optional[int]:
+    """Row-lock one candidate with no overlapping blocking booking (PostgreSQL); None when none is left.
+
+    The NOT EXISTS filter runs on the statement's snapshot, so a booking
+    committed just before the lock was taken can be missed: the locked room is
+    checked again in a fresh statement and skipped if it turned out taken.
+    """
+    remaining = list(candidates)
+    while remaining:
+        room_id = db.execute(text(f"""
+            SELECT r.id FROM tablelink_rooms r
+            WHERE r.id = ANY(:room_ids)
+              AND NOT EXISTS (
+                  SELECT 1 FROM tablelink_room_bookings b
+                  WHERE b.room_id = r.id AND b.check_in_date < :check_out AND b.check_out_date > :check_in
+                    AND b.status IN ({", ".join(f"'{status}'" for status in BLOCKING_STATUSES)})
+              )
+            ORDER BY r.room_number
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """), {"room_ids": remaining, "check_in": check_in, "check_out": check_out}).scalar()
+        if room_id is None:
+            return None
+        if not _has_overlapping_booking(db, room_id, check_in, check_out):
+            return room_id
+        remaining.remove(room_id)
+    return None
+
+def record_booking(hotel_id: int, room_id: int, booking_id: int, check_in, check_out):
+    """Add a committed blocking booking to the hotel's index, if it is loaded"""
+    availability = availability_cache.get(hotel_id)
+    if availability is not None:
+        availability.add_booking(room_id, booking_id, check_in, check_out)
+
+def release_booking(hotel_id: int, room_id: int, booking_id: int):
+    """Free the nights held by a booking that was cancelled or completed"""
+    availability = availability_cache.get(hotel_id)
+    if availability is not None:
+        availability.remove_booking(room_id, booking_id)
+
+def invalidate_availability(hotel_id: int = None):
+    """Drop the index for a hotel (or every hotel) after its rooms or room types change"""
+    if hotel_id is None:
+        availability_cache.clear()
+    else:
+        availability_cache.pop(hotel_id)
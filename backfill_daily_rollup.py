@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import sys
+from models import SessionLocal, create_tables
+from rollup import rebuild_daily_rollup
+
+def backfill_daily_rollup(hotel_id: int = None, batch_size: int = 5000):
+    create_tables()
+    db = SessionLocal()
+    
+    try:
+        target = f"hotel {hotel_id}" if hotel_id is not None else "all hotels"
+        print(f"Rebuilding daily rollup for {target} from completed orders (batch size {batch_size})...")
+        rows = rebuild_daily_rollup(db, hotel_id, batch_size)
+        print(f"\n🎉 Daily rollup rebuilt: {rows} rows")
+        
+    except Exception as e:
+        print(f"❌ Backfill error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python backfill_daily_rollup.py [hotel_id] [batch_size]
+    hotel_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    backfill_daily_rollup(hotel_id, batch_size)
@@ -0,0 +1,135 @@
+"""Year dashboard analytics at 10k/100k/1M order lines: pandas engine vs per-section SQL.
+
+"pandas engine" is analytics_engine.period_analytics: one typed query of the
+period's order lines into a DataFrame, then vectorized groupby/resample for
+every section. "per-section SQL" runs one aggregate query per section
+(summary, top items, categories, staff, daily trend) over the same orders
+and fills missing days and derived figures in Python loops, the way the
+old analytics service did. "rollup" is rollup.rollup_summary plus
+rollup_daily_trend on the daily rollup, which /business/analytics/summary,
+/trends and the dashboard serve. The summaries of all three are checked to agree.
+
+    python benchmarks/bench_analytics.py [order lines ...]
+"""
+from datetime import date, timedelta
+import common
+from sqlalchemy import text
+import models
+from analytics_engine import period_analytics
+from models import COMPLETED_ORDER_STATUS
+from periods import day_range, period_dates
+from rollup import rebuild_daily_rollup, rollup_daily_trend, rollup_summary
+
+PERIOD = "year"
+TREND_DAYS = 30
+
+ORDERS_IN_RANGE = f"""
+    FROM tablelink_orders o
+    JOIN tablelink_order_items oi ON oi.order_id = o.id
+    JOIN tablelink_menu_items mi ON mi.id = oi.product_id
+    WHERE o.hotel_id = :hotel_id AND o.status = '{COMPLETED_ORDER_STATUS}'
+      AND o.created_at >= :start AND o.created_at < :end
+"""
+
+def per_section_analytics(db, hotel_id: int, target_date: date) -> dict:
+    start_date, end_date = period_dates(PERIOD, target_date, year_to_date=True)
+    start, end = day_range(start_date, end_date)
+    params = {"hotel_id": hotel_id, "start": start, "end": end}
+
+    summary = db.execute(text(f"""
+        SELECT COUNT(*) AS total_orders, COALESCE(SUM(revenue), 0) AS total_sales, COALESCE(SUM(tip), 0) AS total_tips
+        FROM (SELECT o.id, SUM(oi.qty * mi.price) AS revenue, MAX(COALESCE(o.tip_amount, 0)) AS tip
+              {ORDERS_IN_RANGE} GROUP BY o.id) per_order
+    """), params).one()
+    top_items = db.execute(text(f"""
+        SELECT mi.name, COALESCE(mi.category, 'Food') AS category, SUM(oi.qty) AS quantity_sold,
+               SUM(oi.qty * mi.price) AS revenue
+        {ORDERS_IN_RANGE}
+        GROUP BY mi.name, COALESCE(mi.category, 'Food') ORDER BY SUM(oi.qty) DESC LIMIT 10
+    """), params).fetchall()
+    categories = db.execute(text(f"""
+        SELECT COALESCE(mi.category, 'Food') AS category, SUM(oi.qty) AS quantity_sold,
+               SUM(oi.qty * mi.price) AS revenue
+        {ORDERS_IN_RANGE}
+        GROUP BY COALESCE(mi.category, 'Food')
+    """), params).fetchall()
+    staff = db.execute(text(f"""
+        SELECT s.name, COUNT(*) AS total_orders, SUM(per_order.revenue) AS total_sales,
+               SUM(per_order.tip) AS total_tips, SUM(per_order.items) AS total_items
+        FROM (SELECT o.id, o.staff_id, SUM(oi.qty * mi.price) AS revenue, SUM(oi.qty) AS items,
+                     MAX(COALESCE(o.tip_amount, 0)) AS tip
+              {ORDERS_IN_RANGE} GROUP BY o.id, o.staff_id) per_order
+        JOIN tablelink_staff s ON s.id = per_order.staff_id
+        GROUP BY s.id, s.name
+    """), params).fetchall()
+
+    trend_start = target_date - timedelta(days=TREND_DAYS - 1)
+    trend_from, trend_to = day_range(trend_start, target_date)
+    by_day = {str(row.day): row for row in db.execute(text(f"""
+        SELECT DATE(o.created_at) AS day, COUNT(DISTINCT o.id) AS orders, SUM(oi.qty * mi.price) AS revenue
+        {ORDERS_IN_RANGE}
+        GROUP BY DATE(o.created_at)
+    """), {"hotel_id": hotel_id, "start": trend_from, "end": trend_to}).fetchall()}
+    trends = []
+    for i in range(TREND_DAYS):
+        day = (trend_start + timedelta(days=i)).isoformat()
+        row = by_day.get(day)
+        trends.append({"date": day, "orders": row.orders if row else 0,
+                       "revenue": float(row.revenue) if row else 0.0})
+
+    waiters = []
+    for row in staff:
+        waiters.append({"name": row.name, "total_orders": row.total_orders, "total_sales": float(row.total_sales),
+                        "total_tips": float(row.total_tips), "total_items": row.total_items,
+                        "avg_order_value": float(row.total_sales) / max(row.total_orders, 1)})
+    return {
+        "summary": {"total_orders": summary.total_orders, "total_sales": float(summary.total_sales),
+                    "total_tips": float(summary.total_tips)},
+        "top_items": [{"name": row.name, "quantity_sold": row.quantity_sold, "revenue": float(row.revenue),
+                       "category": row.category} for row in top_items],
+        "categories": [{"category": row.category, "quantity_sold": row.quantity_sold,
+                        "revenue": float(row.revenue)} for row in categories],
+        "trends": trends,
+        "waiters": waiters
+    }
+
+def rollup_analytics(db, hotel_id: int, target_date: date) -> dict:
+    start_date, end_date = period_dates(PERIOD, target_date, year_to_date=True)
+    result = rollup_summary(db, hotel_id, start_date, end_date)
+    result["trends"] = rollup_daily_trend(db, hotel_id, target_date, TREND_DAYS)
+    return result
+
+VARIANTS = [
+    ("per-section SQL", per_section_analytics),
+    ("pandas engine", lambda db, hotel_id, target_date: period_analytics(db, hotel_id, target_date, PERIOD,
+                                                                         trend_days=TREND_DAYS)),
+    ("rollup", rollup_analytics),
+]
+
+def main():
+    target_date = date.today()
+    rows = []
+    for lines in common.parse_sizes([10000, 100000, 1000000]):
+        common.reset_schema()
+        hotel_id = common.seed_hotel("bench", rooms=100)
+        # Spread over the days of the year so far, so every line falls in the period
+        days = (target_date - date(target_date.year, 1, 1)).days
+        common.seed_order_history(hotel_id, lines, lines_per_order=4, days=days)
+        db = models.SessionLocal()
+        try:
+            rebuild_daily_rollup(db, hotel_id)
+            summaries = []
+            for name, analytics in VARIANTS:
+                result, elapsed, peak = common.measure(analytics, db, hotel_id, target_date)
+                assert "error" not in result, result
+                summary = result["summary"]
+                summaries.append((summary["total_orders"], round(summary["total_sales"], 2),
+                                  round(summary["total_tips"], 2)))
+                rows.append([lines, name, f"{elapsed * 1000:,.0f}", f"{peak / 2**20:,.1f}"])
+        finally:
+            db.close()
+        assert len(set(summaries)) == 1, summaries
+    common.print_table(["order lines", "analytics", "ms", "peak MiB"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Concurrent throughput of /business/orders on the async engine vs a sync Session, one uvicorn worker.
+
+The "sync" variant is the same query and response served the way the route
+used to be: a synchronous Session called from an async def handler, blocking
+the event loop for every query. Both run in one uvicorn worker under the same
+number of concurrent clients. Alongside the load, a probe client measures
+the latency of /debug/auth-pool, an in-memory route that only waits when the
+event loop is blocked.
+
+    python benchmarks/bench_async_routes.py [concurrency ...]
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import common
+import httpx
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from main import app, group_order_rows
+from models import get_db
+
+DURATION_SECONDS = float(os.getenv("BENCH_DURATION", "5"))
+ACTIVE_ORDERS = 100
+
+@app.get("/bench/sync/business/orders")
+async def get_orders_sync_session(hotel_subdomain: str, db: Session = Depends(get_db)):
+    rows = db.execute(text("""
+        SELECT o.id, o.created_at, r.room_number, o.status, mi.name, oi.qty
+        FROM tablelink_orders o
+        JOIN tablelink_rooms r ON o.room_id = r.id
+        JOIN tablelink_hotels h ON r.hotel_id = h.id
+        LEFT JOIN tablelink_order_items oi ON oi.order_id = o.id
+        LEFT JOIN tablelink_menu_items mi ON oi.product_id = mi.id
+        WHERE o.status = 'active' AND h.subdomain = :subdomain
+        ORDER BY o.created_at DESC, o.id DESC, oi.id
+    """), {"subdomain": hotel_subdomain}).fetchall()
+    return group_order_rows(rows)
+
+VARIANTS = [
+    ("sync Session", "/bench/sync/business/orders?hotel_subdomain=bench"),
+    ("async engine (current)", "/business/orders?hotel_subdomain=bench"),
+]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(port: int, max_clients: int) -> subprocess.Popen:
+    # Pools big enough for every client: with fewer connections the sync variant does not
+    # just slow down, it stalls the whole loop for DB_POOL_TIMEOUT waiting on a checkout
+    env = dict(os.environ, DB_POOL_SIZE="5", DB_MAX_OVERFLOW=str(max_clients))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench_async_routes:app", "--port", str(port),
+         "--workers", "1", "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/debug/auth-pool", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+async def load(base_url: str, path: str, concurrency: int):
+    """(requests/s, probe p50 ms, probe p99 ms) over DURATION_SECONDS"""
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + DURATION_SECONDS
+        completed, probe_latencies = 0, []
+
+        async def worker():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                response = await client.get(path)
+                response.raise_for_status()
+                completed += 1
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                (await client.get("/debug/auth-pool")).raise_for_status()
+                probe_latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        await asyncio.gather(probe(), *(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return (completed / elapsed, common.percentile(probe_latencies, 50),
+            common.percentile(probe_latencies, 99))
+
+def main():
+    common.reset_schema()
+    hotel_id = common.seed_hotel("bench", rooms=40)
+    common.seed_order_history(hotel_id, ACTIVE_ORDERS * 3, lines_per_order=3, days=1, status="active")
+
+    client_counts = common.parse_sizes([10, 50, 100])
+    port = free_port()
+    server = start_server(port, max(client_counts))
+    rows = []
+    try:
+        for concurrency in client_counts:
+            for name, path in VARIANTS:
+                throughput, probe_p50, probe_p99 = asyncio.run(load(f"http://127.0.0.1:{port}", path, concurrency))
+                rows.append([concurrency, name, f"{throughput:,.0f}", f"{probe_p50:.1f}", f"{probe_p99:.1f}"])
+    finally:
+        server.terminate()
+        server.wait()
+    common.print_table(["clients", "orders route", "req/s", "probe p50 ms", "probe p99 ms"], rows)
+
+if __name__ == "__main__":
+    main()
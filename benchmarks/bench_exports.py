@@ -0,0 +1,80 @@
+"""Peak memory and time of year-long sales exports over large order histories, streamed vs buffered.
+
+"streamed" consumes exports.sales_csv_chunks / sales_xlsx_chunks the way the
+StreamingResponse does, discarding each chunk once "sent". "buffered" is
+the previous shape: every order fetched at once, the whole file built in a
+StringIO (CSV) or a normal openpyxl workbook (XLSX), then copied into a
+BytesIO. Peak memory is what tracemalloc sees.
+
+    python benchmarks/bench_exports.py [orders ...]
+"""
+import csv
+import io
+from datetime import date, timedelta
+import common
+import openpyxl
+import models
+from exports import SALES_HEADER, _sales_query, sales_csv_chunks, sales_xlsx_chunks
+from periods import day_range
+
+def buffered_orders(hotel_id: int, start_date: date, end_date: date):
+    start, end = day_range(start_date, end_date)
+    db = models.SessionLocal()
+    try:
+        return db.execute(_sales_query(None), {"hotel_id": hotel_id, "start": start, "end": end}).fetchall()
+    finally:
+        db.close()
+
+def buffered_csv(hotel_id: int, start_date: date, end_date: date) -> int:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(SALES_HEADER)
+    for order in buffered_orders(hotel_id, start_date, end_date):
+        writer.writerow([order.order_id, order.room_number, order.staff_name or 'Unknown',
+                         f"€{float(order.total_sales or 0):.2f}", f"€{float(order.tip_amount or 0):.2f}",
+                         str(order.created_at)])
+    return len(io.BytesIO(output.getvalue().encode("utf-8")).getvalue())
+
+def buffered_xlsx(hotel_id: int, start_date: date, end_date: date) -> int:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(SALES_HEADER)
+    for order in buffered_orders(hotel_id, start_date, end_date):
+        ws.append([order.order_id, order.room_number, order.staff_name or 'Unknown',
+                   round(float(order.total_sales or 0), 2), round(float(order.tip_amount or 0), 2),
+                   str(order.created_at)])
+    output = io.BytesIO()
+    wb.save(output)
+    return len(io.BytesIO(output.getvalue()).getvalue())
+
+def streamed(chunks):
+    def consume(hotel_id: int, start_date: date, end_date: date) -> int:
+        size = 0
+        for chunk in chunks(hotel_id, start_date, end_date):
+            size += len(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        return size
+    return consume
+
+VARIANTS = [
+    ("csv", "buffered", buffered_csv),
+    ("csv", "streamed", streamed(sales_csv_chunks)),
+    ("xlsx", "buffered", buffered_xlsx),
+    ("xlsx", "streamed", streamed(sales_xlsx_chunks)),
+]
+
+def main():
+    rows = []
+    end_date = date.today()
+    start_date = end_date - timedelta(days=366)
+    for orders in common.parse_sizes([100000, 1000000]):
+        common.reset_schema()
+        hotel_id = common.seed_hotel("bench", rooms=200)
+        common.seed_order_history(hotel_id, orders * 2, lines_per_order=2, days=365)
+        for file_format, name, export in VARIANTS:
+            size, elapsed, peak = common.measure(export, hotel_id, start_date, end_date)
+            rows.append([orders, file_format, name, f"{size / 2**20:,.1f}", f"{elapsed:.1f}",
+                         f"{peak / 2**20:,.1f}"])
+    common.print_table(["orders", "format", "export", "file MiB", "seconds", "peak MiB"], rows)
+
+if __name__ == "__main__":
+    main()
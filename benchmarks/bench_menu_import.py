@@ -0,0 +1,70 @@
+"""Menu import time and peak memory on a large synthetic Excel sheet.
+
+"per-row commit" is the previous importer: the workbook loaded in full mode,
+then one ORM insert, commit and refresh per row. "streaming" is
+menu_import.import_excel_menu: read-only workbook, rows streamed into
+sync_menu and written in bulk in one transaction. "upload job" is what a
+menu upload job runs: parse_menu_file (all rows, off the event loop) then
+sync_menu. Each variant imports into an empty menu of its own hotel. Peak
+memory is what tracemalloc sees, which includes openpyxl's cells.
+
+    python benchmarks/bench_menu_import.py [rows ...]
+"""
+import io
+import common
+import openpyxl
+import models
+from models import MenuItem
+from menu_import import import_excel_menu, parse_menu_file, sync_menu
+
+def make_sheet(rows: int) -> bytes:
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Name", "Ingredients", "Price", "Category"])
+    for n in range(rows):
+        ws.append([f"Dish {n}", f"ingredient {n % 50}, ingredient {n % 7}, salt", round(4 + n % 40 * 0.5, 2),
+                   ("Breakfast", "Mains", "Desserts", "Drinks")[n % 4]])
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+def import_per_row(db, file_content: bytes, hotel_id: int):
+    wb = openpyxl.load_workbook(io.BytesIO(file_content))
+    for row in wb.active.iter_rows(min_row=2, values_only=True):
+        if row and len(row) >= 3 and row[0] and row[1] and row[2]:
+            item = MenuItem(hotel_id=hotel_id, name=str(row[0]).strip(), ingredients=str(row[1]).strip(),
+                            price=float(row[2]), category=str(row[3]).strip() if len(row) > 3 and row[3] else "Food")
+            db.add(item)
+            db.commit()
+            db.refresh(item)
+
+def import_upload_job(db, file_content: bytes, hotel_id: int):
+    return sync_menu(db, hotel_id, parse_menu_file("menu.xlsx", file_content))
+
+VARIANTS = [
+    ("per-row commit", import_per_row),
+    ("streaming", lambda db, content, hotel_id: import_excel_menu(db, content, hotel_id)),
+    ("upload job", import_upload_job),
+]
+
+def main():
+    common.reset_schema()
+    rows = []
+    for size in common.parse_sizes([2000, 20000]):
+        content = make_sheet(size)
+        for name, run in VARIANTS:
+            hotel_id = common.seed_hotel(f"{name.replace(' ', '-')}-{size}", rooms=0, staff=0)
+            db = models.SessionLocal()
+            try:
+                db.query(MenuItem).filter(MenuItem.hotel_id == hotel_id).delete()
+                db.commit()
+                _, elapsed, peak = common.measure(run, db, content, hotel_id)
+                imported = db.query(MenuItem).filter(MenuItem.hotel_id == hotel_id).count()
+            finally:
+                db.close()
+            assert imported == size, (name, imported)
+            rows.append([size, f"{len(content) / 1024:,.0f}", name, f"{elapsed:.2f}", f"{peak / 2**20:.1f}"])
+    common.print_table(["rows", "file KiB", "importer", "seconds", "peak MiB"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Orders/s at 50-500 concurrent guests: per-request commit vs write-behind batching (ORDER_BATCHING).
+
+Each guest places ORDERS_PER_GUEST orders in a row through
+main.create_room_order, the body of /client/order, on its own session, all
+guests at once on one event loop. With the batcher running, orders are
+committed in batches of up to ORDER_BATCH_MAX, and each call still returns
+only after its batch is committed. "failed" counts orders the database
+refused, e.g. with "database is locked" on SQLite.
+
+    python benchmarks/bench_order_batching.py [guests ...]
+"""
+import asyncio
+import json
+import os
+import time
+import common
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+import models
+from main import create_room_order, order_batcher
+
+ORDERS_PER_GUEST = int(os.getenv("BENCH_ORDERS_PER_GUEST", "4"))
+ROOMS = 200
+
+async def run(guests: int, rooms: list, items: str, batching: bool):
+    """(committed orders/s, p99 latency ms, failed orders)"""
+    if batching:
+        order_batcher.start()
+    latencies = []
+    failed = 0
+
+    async def guest(n: int):
+        nonlocal failed
+        room_number, code = rooms[n % len(rooms)]
+        for _ in range(ORDERS_PER_GUEST):
+            started = time.perf_counter()
+            try:
+                async with models.AsyncSessionLocal() as db:
+                    await create_room_order(db, room_number, code, items)
+            except OperationalError:
+                # e.g. "database is locked"; /client/order answers these with a generic message
+                failed += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(guest(n) for n in range(guests)))
+    finally:
+        elapsed = time.perf_counter() - started
+        if batching:
+            await order_batcher.stop()
+    return len(latencies) / elapsed, common.percentile(latencies, 99), failed
+
+async def bench(guest_counts: list, rooms: list, items: str) -> list:
+    # One event loop for every run: pooled aiosqlite/asyncpg connections belong to the loop
+    rows, committed = [], 0
+    for guests in guest_counts:
+        for name, batching in (("per-request commit", False), ("write-behind", True)):
+            batches_before = order_batcher.batches
+            throughput, p99, failed = await run(guests, rooms, items, batching)
+            batches = order_batcher.batches - batches_before
+            committed += guests * ORDERS_PER_GUEST - failed
+            rows.append([guests, name, f"{throughput:,.0f}", f"{p99:.0f}", failed,
+                         f"{(guests * ORDERS_PER_GUEST - failed) / batches:.1f}" if batches else "-"])
+    await models.async_engine.dispose()
+    return rows, committed
+
+def main():
+    common.reset_schema()
+    common.seed_hotel("bench", rooms=ROOMS)
+    with models.engine.connect() as conn:
+        rooms = conn.execute(text("SELECT room_number, code FROM tablelink_rooms ORDER BY room_number")).fetchall()
+        product_ids = conn.execute(text("SELECT id FROM tablelink_menu_items")).scalars().all()
+    items = json.dumps([{"product_id": product_id, "qty": 1} for product_id in product_ids[:3]])
+
+    guest_counts = common.parse_sizes([50, 100, 250, 500])
+    rows, committed = asyncio.run(bench(guest_counts, rooms, items))
+    with models.engine.connect() as conn:
+        placed = conn.execute(text("SELECT COUNT(*) FROM tablelink_orders")).scalar_one()
+    assert placed == committed, (placed, committed)
+    common.print_table(["guests", "ingestion", "orders/s", "p99 ms", "failed", "orders/batch"], rows)
+
+if __name__ == "__main__":
+    main()
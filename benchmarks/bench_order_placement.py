@@ -0,0 +1,81 @@
+"""Order placement latency, p50/p99, for 1, 10 and 50-item orders.
+
+"current" is main.insert_room_order plus the commit, as /client/order runs it:
+INSERT ... RETURNING, one executemany for the items, and the room flag
+update. "per-item" is the previous shape on the same async session:
+INSERT, SELECT last_insert_rowid(), one INSERT per item, then the room
+update (SQLite only, so it is skipped on other databases). Statements counts
+what each order sends to the database.
+
+    python benchmarks/bench_order_placement.py [orders per size]
+"""
+import asyncio
+import time
+from datetime import datetime
+import common
+from sqlalchemy import event, text
+import models
+from main import insert_room_order
+
+ITEM_COUNTS = (1, 10, 50)
+
+async def place_current(db, hotel_id: int, room_id: int, order_items: list):
+    await insert_room_order(db, hotel_id, room_id, order_items)
+    await db.commit()
+
+async def place_per_item(db, hotel_id: int, room_id: int, order_items: list):
+    await db.execute(text("""
+        INSERT INTO tablelink_orders (hotel_id, room_id, created_at, status)
+        VALUES (:hotel_id, :room_id, :created_at, 'active')
+    """), {"hotel_id": hotel_id, "room_id": room_id, "created_at": datetime.utcnow()})
+    order_id = (await db.execute(text("SELECT last_insert_rowid()"))).scalar_one()
+    for item in order_items:
+        await db.execute(text("""
+            INSERT INTO tablelink_order_items (order_id, product_id, qty)
+            VALUES (:order_id, :product_id, :qty)
+        """), {"order_id": order_id, "product_id": item["product_id"], "qty": item["qty"]})
+    await db.execute(text("UPDATE tablelink_rooms SET has_extra_order = true WHERE id = :room_id"),
+                     {"room_id": room_id})
+    await db.commit()
+
+async def run(place, hotel_id: int, room_ids: list, product_ids: list, items: int, orders: int):
+    """(latencies in ms, statements per order)"""
+    statements = 0
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    order_items = [{"product_id": product_ids[i % len(product_ids)], "qty": 1 + i % 3} for i in range(items)]
+    latencies = []
+    async with models.AsyncSessionLocal() as db:
+        for n in range(orders + 20):
+            if n == 20:  # first 20 orders warm the connection and statement caches
+                latencies.clear()
+                event.listen(models.async_engine.sync_engine, "before_cursor_execute", count_statement)
+            started = time.perf_counter()
+            await place(db, hotel_id, room_ids[n % len(room_ids)], order_items)
+            latencies.append((time.perf_counter() - started) * 1000)
+    event.remove(models.async_engine.sync_engine, "before_cursor_execute", count_statement)
+    return latencies, statements / orders
+
+def main():
+    common.reset_schema()
+    hotel_id = common.seed_hotel("bench", rooms=50)
+    with models.engine.connect() as conn:
+        room_ids = conn.execute(text("SELECT id FROM tablelink_rooms")).scalars().all()
+        product_ids = conn.execute(text("SELECT id FROM tablelink_menu_items")).scalars().all()
+
+    variants = [("current", place_current)]
+    if models.engine.dialect.name == "sqlite":
+        variants.insert(0, ("per-item", place_per_item))
+    orders = common.parse_sizes([500])[0]
+    rows = []
+    for items in ITEM_COUNTS:
+        for name, place in variants:
+            latencies, statements = asyncio.run(run(place, hotel_id, room_ids, product_ids, items, orders))
+            rows.append([items, name, f"{statements:.0f}", f"{common.percentile(latencies, 50):.2f}",
+                         f"{common.percentile(latencies, 99):.2f}"])
+    common.print_table(["items", "placement", "statements", "p50 ms", "p99 ms"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Room provisioning time for 100/1000/5000 rooms: bulk upsert vs per-room SELECT + INSERT/UPDATE.
+
+"bulk" is room_provisioning.provision_rooms as onboarding and add-room-type
+call it. "per-room" is the previous loop: an existence check per room
+followed by an INSERT or UPDATE. Each size is provisioned on a fresh hotel
+("new"), then provisioned again with updates ("existing"), in one
+transaction each.
+
+    python benchmarks/bench_room_provisioning.py [rooms ...]
+"""
+import time
+import common
+from sqlalchemy import event, text
+import models
+from room_provisioning import DEFAULT_AMENITIES, provision_rooms
+
+DETAILS = {"room_type": "Double", "price_per_night": 120.0, "max_guests": 2, "description": "Sea view"}
+
+def provision_per_room(db, hotel_id: int, room_numbers, details: dict, version: int, update_existing: bool = False):
+    for room_number in room_numbers:
+        existing = db.execute(text("""
+            SELECT id FROM tablelink_rooms WHERE hotel_id = :hotel_id AND room_number = :room_number
+        """), {"hotel_id": hotel_id, "room_number": room_number}).fetchone()
+        if existing:
+            if update_existing:
+                db.execute(text("""
+                    UPDATE tablelink_rooms SET room_type = :room_type, price_per_night = :price_per_night,
+                           max_guests = :max_guests, description = :description, amenities = :amenities
+                    WHERE id = :id
+                """), {"id": existing.id, "amenities": DEFAULT_AMENITIES, **details})
+            continue
+        db.execute(text("""
+            INSERT INTO tablelink_rooms
+            (hotel_id, room_number, room_type, price_per_night, max_guests,
+             description, code, amenities, status, version)
+            VALUES (:hotel_id, :room_number, :room_type, :price_per_night, :max_guests,
+                    :description, :code, :amenities, 'available', :version)
+        """), {"hotel_id": hotel_id, "room_number": room_number, "code": f"R{room_number}",
+               "amenities": DEFAULT_AMENITIES, "version": version, **details})
+
+def timed(provision, hotel_id: int, rooms: int, update_existing: bool):
+    """(seconds, statements) of provisioning rooms 1..rooms and committing"""
+    statements = 0
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    db = models.SessionLocal()
+    event.listen(models.engine, "before_cursor_execute", count_statement)
+    try:
+        started = time.perf_counter()
+        provision(db, hotel_id, range(1, rooms + 1), DETAILS, 1, update_existing=update_existing)
+        db.commit()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(models.engine, "before_cursor_execute", count_statement)
+        db.close()
+    return elapsed, statements
+
+def main():
+    common.reset_schema()
+    rows = []
+    for rooms in common.parse_sizes([100, 1000, 5000]):
+        for name, provision in (("per-room", provision_per_room), ("bulk", provision_rooms)):
+            hotel_id = common.seed_hotel(f"{name}-{rooms}", rooms=0, staff=0)
+            for state, update_existing in (("new", False), ("existing", True)):
+                elapsed, statements = timed(provision, hotel_id, rooms, update_existing)
+                rows.append([rooms, state, name, statements, f"{elapsed * 1000:,.1f}"])
+            with models.engine.connect() as conn:
+                assert conn.execute(text("SELECT COUNT(*) FROM tablelink_rooms WHERE hotel_id = :hotel_id"),
+                                    {"hotel_id": hotel_id}).scalar_one() == rooms
+    common.print_table(["rooms", "rooms were", "provisioning", "statements", "ms"], rows)
+
+if __name__ == "__main__":
+    main()
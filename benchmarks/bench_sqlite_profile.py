@@ -0,0 +1,100 @@
+"""Mixed read/write throughput on SQLite: SQLITE_PROFILE=default vs tuned.
+
+Writer threads place orders (order row + items, one transaction each, like
+/client/order) while reader threads run the dashboard's order-lines query for
+the last week, the way several uvicorn workers share one database file. Each
+profile gets its own freshly seeded file. "locked" counts operations that
+failed with "database is locked".
+
+    python benchmarks/bench_sqlite_profile.py [writers ...]
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+import common
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+import models
+from analytics_engine import ORDER_LINES_QUERY
+from pool_metrics import engine_pool_kwargs
+from sqlite_profile import SQLITE_PROFILES, apply_sqlite_profile
+
+DURATION_SECONDS = float(os.getenv("BENCH_DURATION", "5"))
+READERS = 4
+HISTORY_LINES = 50000
+
+def make_engine(profile: str):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix=f'tablelink-{profile}-'), 'bench.db')}"
+    engine = create_engine(url, **engine_pool_kwargs(url, "sync"))
+    apply_sqlite_profile(engine, profile)
+    models.Base.metadata.create_all(bind=engine)
+    hotel_id = common.seed_hotel("bench", rooms=50, engine=engine)
+    common.seed_order_history(hotel_id, HISTORY_LINES, days=90, engine=engine)
+    return engine, hotel_id
+
+def run(engine, hotel_id: int, writers: int) -> dict:
+    with engine.connect() as conn:
+        room_ids = conn.execute(text("SELECT id FROM tablelink_rooms")).scalars().all()
+        product_ids = conn.execute(text("SELECT id FROM tablelink_menu_items")).scalars().all()
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + DURATION_SECONDS
+
+    def count(key: str):
+        with lock:
+            counts[key] += 1
+
+    def writer():
+        rng = random.Random()
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as conn:
+                    order_id = conn.execute(text("""
+                        INSERT INTO tablelink_orders (hotel_id, room_id, created_at, status, tip_amount)
+                        VALUES (:hotel_id, :room_id, :created_at, 'active', 0)
+                        RETURNING id
+                    """), {"hotel_id": hotel_id, "room_id": rng.choice(room_ids),
+                           "created_at": datetime.utcnow()}).scalar_one()
+                    conn.execute(text("""
+                        INSERT INTO tablelink_order_items (order_id, product_id, qty) VALUES (:order_id, :product_id, 1)
+                    """), [{"order_id": order_id, "product_id": rng.choice(product_ids)} for _ in range(3)])
+                count("writes")
+            except OperationalError:
+                count("locked")
+
+    def reader():
+        while time.perf_counter() < deadline:
+            end = datetime.utcnow()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(ORDER_LINES_QUERY), {"hotel_id": hotel_id, "start": end - timedelta(days=7),
+                                                           "end": end}).fetchall()
+                count("reads")
+            except OperationalError:
+                count("locked")
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(READERS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {key: value / elapsed for key, value in counts.items()} | {"locked_total": counts["locked"]}
+
+def main():
+    engines = {profile: make_engine(profile) for profile in SQLITE_PROFILES}
+    rows = []
+    for writers in common.parse_sizes([1, 4, 16]):
+        for profile, (engine, hotel_id) in engines.items():
+            result = run(engine, hotel_id, writers)
+            rows.append([writers, READERS, profile, f"{result['writes']:,.0f}", f"{result['reads']:,.0f}",
+                         result["locked_total"]])
+    common.print_table(["writers", "readers", "profile", "orders/s", "reads/s", "locked"], rows)
+
+if __name__ == "__main__":
+    main()
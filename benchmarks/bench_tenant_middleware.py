@@ -0,0 +1,107 @@
+"""Per-request overhead of the tenant middleware: BaseHTTPMiddleware (before) vs pure ASGI (now).
+
+Requests are driven straight through the ASGI interface, with no server or
+socket, against a handler that only returns "ok". The tenant is resolved from
+the /r/<subdomain>/ path and served from the tenant cache, as in production.
+Overhead is the time per request on top of the same app without middleware.
+
+    python benchmarks/bench_tenant_middleware.py [requests ...]
+"""
+import asyncio
+import time
+import common
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from middleware import TenantMiddleware
+from models import get_db
+from tenant import get_restaurant_from_request, set_tenant_context, reset_tenant_context
+
+class BaseHTTPTenantMiddleware(BaseHTTPMiddleware):
+    """The previous middleware's structure (minus its logging), on today's tenant cache"""
+
+    async def dispatch(self, request: Request, call_next):
+        db = next(get_db())
+        try:
+            original_path = request.url.path
+            restaurant = get_restaurant_from_request(request, db, original_path)
+            request.state.restaurant = restaurant
+            request.state.restaurant_id = restaurant.id
+            if original_path.startswith("/r/"):
+                parts = original_path.split("/")
+                if len(parts) >= 4:
+                    request.scope["path"] = "/" + "/".join(parts[3:])
+        finally:
+            db.close()
+        token = set_tenant_context(restaurant)
+        try:
+            return await call_next(request)
+        finally:
+            reset_tenant_context(token)
+
+def make_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("ok")
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+def scope_for(path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"localhost:8000")],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 8000)
+    }
+
+async def request(app, path: str, statuses: list):
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        # After the body the client just waits: BaseHTTPMiddleware listens for the disconnect
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await app(scope_for(path), receive, send)
+
+async def run(app, path: str, requests: int) -> float:
+    statuses = []
+    for _ in range(50):  # warm up: routing tables, tenant cache, connection pool
+        await request(app, path, statuses)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await request(app, path, statuses)
+    elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}, set(statuses)
+    return elapsed
+
+def main():
+    common.reset_schema()
+    common.seed_hotel("bench", rooms=0)
+    variants = [
+        ("no middleware", make_app(), "/ping"),
+        ("BaseHTTPMiddleware", make_app(BaseHTTPTenantMiddleware), "/r/bench/ping"),
+        ("pure ASGI (current)", make_app(TenantMiddleware), "/r/bench/ping"),
+    ]
+    rows = []
+    for requests in common.parse_sizes([20000]):
+        baseline = None
+        for name, app, path in variants:
+            elapsed = asyncio.run(run(app, path, requests))
+            per_request = elapsed / requests * 1e6
+            baseline = per_request if baseline is None else baseline
+            rows.append([requests, name, f"{requests / elapsed:,.0f}", f"{per_request:.1f}",
+                         f"{per_request - baseline:.1f}"])
+    common.print_table(["requests", "middleware", "req/s", "us/request", "overhead us"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Shared setup for the benchmark scripts in this directory.
+
+Import it before any application module: models.py reads DATABASE_URL at
+import time, so this points it at a throwaway SQLite file first (or at
+BENCH_DATABASE_URL when set, e.g. a scratch PostgreSQL database). The
+benchmarks drop and recreate every table in that database.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.getenv("BENCH_DATABASE_URL"):
+    # Exported so a server started by a benchmark (which imports this too) shares the database
+    _DB_DIR = tempfile.mkdtemp(prefix="tablelink-bench-")
+    os.environ["BENCH_DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}"
+os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+
+from sqlalchemy import text
+import models
+
+# Menu of the seeded hotel: (name, category, price)
+MENU = [(f"Item {i}", ("Breakfast", "Drinks", "Mains", "Desserts")[i % 4], 3.0 + i % 20) for i in range(40)]
+
+def reset_schema():
+    """Drop and recreate every table, and empty the in-process caches"""
+    from availability import invalidate_availability
+    from menu_cache import invalidate_menu
+    from tenant import invalidate_tenant
+    models.Base.metadata.drop_all(bind=models.engine)
+    models.create_tables()
+    invalidate_availability()
+    invalidate_menu()
+    invalidate_tenant()
+
+def seed_hotel(subdomain: str = "bench", rooms: int = 20, room_type: str = "Double", staff: int = 5,
+               engine=None) -> int:
+    """A hotel with rooms 101.., the MENU items and a few staff members; returns its id"""
+    engine = engine or models.engine
+    with engine.begin() as conn:
+        hotel_id = conn.execute(text("""
+            INSERT INTO tablelink_hotels (name, subdomain, active, rooms_version)
+            VALUES (:name, :subdomain, true, 0)
+            RETURNING id
+        """), {"name": subdomain.title(), "subdomain": subdomain}).scalar_one()
+        if rooms:
+            conn.execute(text("""
+                INSERT INTO tablelink_rooms (hotel_id, room_number, code, status, room_type, price_per_night, version)
+                VALUES (:hotel_id, :room_number, :code, 'available', :room_type, 100.0, 0)
+            """), [{"hotel_id": hotel_id, "room_number": 101 + i, "code": f"{i % 1000:03d}", "room_type": room_type}
+                   for i in range(rooms)])
+        conn.execute(text("""
+            INSERT INTO tablelink_menu_items (hotel_id, name, ingredients, price, category, active)
+            VALUES (:hotel_id, :name, :name, :price, :category, true)
+        """), [{"hotel_id": hotel_id, "name": name, "price": price, "category": category}
+               for name, category, price in MENU])
+        if staff:
+            conn.execute(text("INSERT INTO tablelink_staff (hotel_id, name, active) VALUES (:hotel_id, :name, true)"),
+                         [{"hotel_id": hotel_id, "name": f"Staff {i}"} for i in range(staff)])
+    return hotel_id
+
+def seed_order_history(hotel_id: int, order_lines: int, lines_per_order: int = 4, days: int = 365,
+                       status: str = models.COMPLETED_ORDER_STATUS, batch: int = 20000, engine=None) -> int:
+    """Insert completed orders totalling about order_lines item rows, spread over the last days.
+
+    Returns the number of orders. Rows are written in batches of executemany
+    inserts so a million lines stays within a few tens of seconds on SQLite.
+    """
+    engine = engine or models.engine
+    with engine.begin() as conn:
+        room_ids = conn.execute(text("SELECT id FROM tablelink_rooms WHERE hotel_id = :hotel_id"),
+                                {"hotel_id": hotel_id}).scalars().all()
+        product_ids = conn.execute(text("SELECT id FROM tablelink_menu_items WHERE hotel_id = :hotel_id"),
+                                   {"hotel_id": hotel_id}).scalars().all()
+        staff_ids = conn.execute(text("SELECT id FROM tablelink_staff WHERE hotel_id = :hotel_id"),
+                                 {"hotel_id": hotel_id}).scalars().all() or [None]
+        next_order_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) + 1 FROM tablelink_orders")).scalar_one()
+
+    orders_count = max(1, order_lines // lines_per_order)
+    start = datetime.utcnow().replace(microsecond=0) - timedelta(days=days)
+    step = timedelta(days=days) / orders_count
+    for first in range(0, orders_count, batch):
+        orders, lines = [], []
+        for n in range(first, min(first + batch, orders_count)):
+            order_id = next_order_id + n
+            orders.append({"id": order_id, "hotel_id": hotel_id, "room_id": room_ids[n % len(room_ids)],
+                           "staff_id": staff_ids[n % len(staff_ids)], "created_at": start + step * n,
+                           "status": status, "tip_amount": float(n % 5)})
+            lines.extend({"order_id": order_id, "product_id": product_ids[(n + k) % len(product_ids)],
+                          "qty": 1 + (n + k) % 3} for k in range(lines_per_order))
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO tablelink_orders (id, hotel_id, room_id, staff_id, created_at, status, tip_amount)
+                VALUES (:id, :hotel_id, :room_id, :staff_id, :created_at, :status, :tip_amount)
+            """), orders)
+            conn.execute(text("""
+                INSERT INTO tablelink_order_items (order_id, product_id, qty, is_extra_item, is_new_extra)
+                VALUES (:order_id, :product_id, :qty, false, false)
+            """), lines)
+    return orders_count
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of samples (pct in 0..100)"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+def measure(func, *args, **kwargs):
+    """(result, seconds, peak traced Python memory in bytes) of one call.
+
+    tracemalloc only sees allocations made through Python's allocator, which
+    covers rows, strings and DataFrames but not SQLite's own page cache.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def parse_sizes(default):
+    """Sizes from the command line (python bench_x.py 100 1000), else the defaults"""
+    return [int(arg) for arg in sys.argv[1:]] or list(default)
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, ["-" * width for width in widths], *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import os
+from typing import Dict, Optional, Set
+
+ALL_HOTELS = None  # subscription key for dashboards that are not scoped to one hotel
+
+HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+class EventBroker:
+    """In-process pub/sub fan-out of dashboard events, keyed by hotel id.
+
+    Every connected dashboard owns a bounded asyncio.Queue. publish() never
+    blocks: a subscriber that falls behind loses its oldest events instead
+    of holding up the writer.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[Optional[int], Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, hotel_id: Optional[int]) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(hotel_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, hotel_id: Optional[int], queue: asyncio.Queue):
+        queues = self._subscribers.get(hotel_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[hotel_id]
+
+    def publish(self, hotel_id: int, event: str, data: dict):
+        """Push an event to the hotel's dashboards (and unscoped ones). Safe to call from any thread."""
+        if not self._subscribers or self._loop is None:
+            return
+        message = format_sse(event, data)
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self._deliver(hotel_id, message)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, hotel_id, message)
+
+    def _deliver(self, hotel_id: int, message: str):
+        for key in (hotel_id, ALL_HOTELS):
+            for queue in tuple(self._subscribers.get(key, ())):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(message)
+
+    def subscriber_count(self, hotel_id: Optional[int] = ALL_HOTELS) -> int:
+        return len(self._subscribers.get(hotel_id, ()))
+
+broker = EventBroker()
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def event_stream(request, hotel_id: Optional[int]):
+    """Server-Sent Events generator for one dashboard connection"""
+    queue = broker.subscribe(hotel_id)
+    try:
+        # Tell EventSource how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                message = ": keepalive\n\n"
+            yield message
+    finally:
+        broker.unsubscribe(hotel_id, queue)
@@ -0,0 +1,181 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Iterator, Optional
+from sqlalchemy import text
+from models import SessionLocal, COMPLETED_ORDER_STATUS
+from periods import day_range
+
+# Rows fetched per round trip (server-side cursor on PostgreSQL) and rows per CSV chunk
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+CSV_CHUNK_ROWS = 500
+FILE_CHUNK_BYTES = 64 * 1024
+
+SALES_HEADER = ['Order ID', 'Room Number', 'Staff', 'Sales', 'Tips', 'Date']
+TOP_ITEMS_HEADER = ['Rank', 'Item Name', 'Category', 'Quantity Sold', 'Revenue', 'Orders', 'Avg Price', 'Avg Revenue/Order']
+
+def _sales_query(staff_id: Optional[int]):
+    # Per-order totals come from a correlated subquery rather than a GROUP BY, so rows
+    # leave the database in index order as they are read instead of after a full sort.
+    staff_filter = "AND o.staff_id = :staff_id" if staff_id else ""
+    return text(f"""
+        SELECT o.id AS order_id, r.room_number, s.name AS staff_name, o.created_at,
+               COALESCE(o.tip_amount, 0) AS tip_amount,
+               (SELECT COALESCE(SUM(oi.qty * mi.price), 0)
+                FROM tablelink_order_items oi
+                JOIN tablelink_menu_items mi ON mi.id = oi.product_id
+                WHERE oi.order_id = o.id) AS total_sales
+        FROM tablelink_orders o
+        LEFT JOIN tablelink_rooms r ON r.id = o.room_id
+        LEFT JOIN tablelink_staff s ON s.id = o.staff_id
+        WHERE o.hotel_id = :hotel_id AND o.status = '{COMPLETED_ORDER_STATUS}'
+          AND o.created_at >= :start AND o.created_at < :end
+          {staff_filter}
+        ORDER BY o.created_at DESC
+    """)
+
+TOP_ITEMS_QUERY = text(f"""
+    SELECT mi.name, mi.category, SUM(oi.qty) AS quantity_sold,
+           SUM(oi.qty * mi.price) AS revenue, COUNT(DISTINCT o.id) AS orders_count,
+           AVG(mi.price) AS avg_price
+    FROM tablelink_orders o
+    JOIN tablelink_order_items oi ON oi.order_id = o.id
+    JOIN tablelink_menu_items mi ON mi.id = oi.product_id
+    WHERE o.hotel_id = :hotel_id AND o.status = '{COMPLETED_ORDER_STATUS}'
+      AND o.created_at >= :start AND o.created_at < :end
+    GROUP BY mi.id, mi.name, mi.category
+    ORDER BY SUM(oi.qty) DESC
+    LIMIT :limit
+""")
+
+def iter_sales_orders(hotel_id: int, start_date: date, end_date: date, staff_id: int = None) -> Iterator:
+    """Completed orders of the days start_date..end_date, newest first, streamed from the database.
+
+    Uses its own session so the response body can keep reading after the
+    request's session has been closed. On SQLite without the tuned (WAL)
+    profile the open read holds off writers until the export finishes.
+    """
+    start, end = day_range(start_date, end_date)
+    db = SessionLocal()
+    try:
+        result = db.execute(_sales_query(staff_id),
+                            {"hotel_id": hotel_id, "start": start, "end": end, "staff_id": staff_id},
+                            execution_options={"yield_per": EXPORT_YIELD_PER})
+        yield from result
+    finally:
+        db.close()
+
+def _format_created_at(value) -> str:
+    # Raw SQLite rows return timestamps as strings
+    return value if isinstance(value, str) else value.isoformat()
+
+def _created_at_datetime(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+class _SalesTotals:
+    def __init__(self):
+        self.orders = 0
+        self.sales = 0.0
+        self.tips = 0.0
+
+    def add(self, order):
+        self.orders += 1
+        self.sales += float(order.total_sales or 0)
+        self.tips += float(order.tip_amount or 0)
+
+def _csv_text(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+def sales_csv_chunks(hotel_id: int, start_date: date, end_date: date, staff_id: int = None) -> Iterator[str]:
+    """Sales CSV (orders, then a summary) generated CSV_CHUNK_ROWS orders at a time"""
+    totals = _SalesTotals()
+    rows = [SALES_HEADER]
+    for order in iter_sales_orders(hotel_id, start_date, end_date, staff_id):
+        totals.add(order)
+        rows.append([
+            order.order_id,
+            order.room_number,
+            order.staff_name or 'Unknown',
+            f"€{float(order.total_sales or 0):.2f}",
+            f"€{float(order.tip_amount or 0):.2f}",
+            _format_created_at(order.created_at)
+        ])
+        if len(rows) >= CSV_CHUNK_ROWS:
+            yield _csv_text(rows)
+            rows = []
+
+    if not totals.orders:
+        rows.append(['No sales data available for this period', '', '', '', '', ''])
+    rows += [
+        [],
+        ['SUMMARY'],
+        ['Total Orders', totals.orders],
+        ['Total Sales', f"€{totals.sales:.2f}"],
+        ['Total Tips', f"€{totals.tips:.2f}"]
+    ]
+    yield _csv_text(rows)
+
+def sales_xlsx_chunks(hotel_id: int, start_date: date, end_date: date, staff_id: int = None) -> Iterator[bytes]:
+    """Sales workbook built with openpyxl's write-only mode, then streamed from a temporary file.
+
+    Write-only worksheets spool their rows to disk as they are appended, so
+    memory stays flat however many orders the period holds. Dates are written
+    as datetimes: every distinct string would stay in the shared strings table.
+    """
+    import openpyxl
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Sales")
+    ws.append(SALES_HEADER)
+    totals = _SalesTotals()
+    for order in iter_sales_orders(hotel_id, start_date, end_date, staff_id):
+        totals.add(order)
+        ws.append([
+            order.order_id,
+            order.room_number,
+            order.staff_name or 'Unknown',
+            round(float(order.total_sales or 0), 2),
+            round(float(order.tip_amount or 0), 2),
+            _created_at_datetime(order.created_at)
+        ])
+
+    summary = wb.create_sheet("Summary")
+    summary.append(['Total Orders', totals.orders])
+    summary.append(['Total Sales', round(totals.sales, 2)])
+    summary.append(['Total Tips', round(totals.tips, 2)])
+
+    with tempfile.TemporaryFile() as output:
+        wb.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(FILE_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+def top_items_csv_chunks(hotel_id: int, start_date: date, end_date: date, limit: int = 50) -> Iterator[str]:
+    """Best selling items of the period by quantity, as CSV"""
+    start, end = day_range(start_date, end_date)
+    db = SessionLocal()
+    try:
+        items = db.execute(TOP_ITEMS_QUERY, {"hotel_id": hotel_id, "start": start, "end": end, "limit": limit}).fetchall()
+    finally:
+        db.close()
+
+    rows = [TOP_ITEMS_HEADER]
+    for rank, item in enumerate(items, 1):
+        revenue = float(item.revenue or 0)
+        rows.append([
+            rank,
+            item.name,
+            item.category,
+            item.quantity_sold,
+            f"€{revenue:.2f}",
+            item.orders_count,
+            f"€{float(item.avg_price or 0):.2f}",
+            f"€{revenue / max(item.orders_count, 1):.2f}"
+        ])
+    yield _csv_text(rows)
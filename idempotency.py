@@ -0,0 +1,57 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from cache import TTLCache
+
+_MISSING = object()
+
+class IdempotencyStore:
+    """Short-lived, bounded record of results keyed by client-supplied Idempotency-Key.
+
+    A repeat of a completed request gets the stored result back; a repeat that
+    arrives while the first is still running waits for it instead of running
+    again. Failures are not stored, so a retry after an error runs again.
+    Results live in a TTLCache (O(1) lookup, LRU-bounded); the in-flight map only
+    holds requests that are currently executing. State is per process.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0):
+        self._results = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def run_once(self, key: Optional[Hashable], handler: Callable[[], Awaitable[Any]]) -> Any:
+        if key is None:
+            return await handler()
+
+        result = self._results.get(key, _MISSING)
+        if result is not _MISSING:
+            return result
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            # shield: a disconnecting duplicate must not cancel the original's future
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await handler()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            self._results.set(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._in_flight), **self._results.stats()}
+
+order_idempotency = IdempotencyStore(
+    max_entries=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("IDEMPOTENCY_TTL", "600"))
+)
@@ -1,19 +1,35 @@
-from fastapi import FastAPI, Depends, HTTPException, Request, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Depends, HTTPException, Request, Form, Header, Query
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from datetime import datetime
+from datetime import datetime, date, timedelta
 import sys
 import os
 import json
+import hashlib
 
 # Add current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from models import create_tables, get_db, Hotel, Room, Staff, User, MenuItem, Order
-from auth import verify_password, get_password_hash
+from models import create_tables, get_db, get_async_db, async_engine, AsyncSessionLocal, SessionLocal, Hotel, Room, Staff, User, MenuItem, Order
+from auth import get_password_hash_async, verify_password_async, AuthQueueFull, hash_pool_stats
+from tenant import invalidate_tenant
+from menu_cache import get_menu_payload_async, invalidate_menu, etag_matches
+from events import broker, event_stream, ALL_HOTELS
+from pool_metrics import pool_status
+from idempotency import order_idempotency
+from availability import get_hotel_availability, allocate_room, record_booking, release_booking, invalidate_availability, BLOCKING_STATUSES
+from order_queue import OrderBatcher, ORDER_BATCHING, ORDER_BATCH_MAX, ORDER_BATCH_INTERVAL_MS
+from room_provisioning import bump_hotel_rooms_version, provision_rooms
+from menu_jobs import submit_menu_import, get_menu_import_job, fail_stale_jobs, shutdown_menu_jobs
+from exports import sales_csv_chunks, sales_xlsx_chunks, top_items_csv_chunks
+from parquet_export import parquet_chunks, require_pyarrow, invalidate_order_snapshots, DATASETS as PARQUET_DATASETS
+from periods import period_dates, PERIODS, TREND_WINDOWS
+from rollup import add_orders_to_rollup, rollup_summary, rollup_daily_trend
+import analytics_engine
 
 app = FastAPI()
 
@@ -26,6 +42,19 @@ templates = Jinja2Templates(directory=templates_dir)
 @app.on_event("startup")
 async def startup_event():
     create_tables()
+    db = SessionLocal()
+    try:
+        fail_stale_jobs(db)
+    finally:
+        db.close()
+    if ORDER_BATCHING:
+        order_batcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await order_batcher.stop()
+    await shutdown_menu_jobs()
+    await async_engine.dispose()
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
@@ -78,58 +107,28 @@ async def complete_onboarding(request: Request, db: Session = Depends(get_db)):
             """), hotel_data)
             hotel_id = db.execute(text("SELECT last_insert_rowid()")).fetchone()[0]
         
+        # New rooms are stamped with a fresh rooms_version so delta clients pick them up
+        rooms_version = bump_hotel_rooms_version(db, hotel_id)
+        
         # Process room type configurations
         room_type_number = 1
         while f"room_type_name_{room_type_number}" in form:
-            room_type_name = form.get(f"room_type_name_{room_type_number}")
-            room_type_price = float(form.get(f"room_type_price_{room_type_number}"))
-            room_type_guests = int(form.get(f"room_type_guests_{room_type_number}"))
-            room_type_count = int(form.get(f"room_type_count_{room_type_number}"))
-            room_type_description = form.get(f"room_type_description_{room_type_number}", "")
             room_type_start = int(form.get(f"room_type_start_{room_type_number}"))
+            room_type_count = int(form.get(f"room_type_count_{room_type_number}"))
             
-            # Create multiple rooms of this type
-            for i in range(room_type_count):
-                room_number = room_type_start + i
-                room_data = {
-                    "hotel_id": hotel_id,
-                    "room_number": room_number,
-                    "room_type": room_type_name,
-                    "price_per_night": room_type_price,
-                    "max_guests": room_type_guests,
-                    "description": room_type_description,
-                    "code": f"R{room_number}",
-                    "amenities": "WiFi, AC, TV, Room Service"
-                }
-                
-                # Check if room exists
-                existing_room = db.execute(text("""
-                    SELECT id FROM tablelink_rooms 
-                    WHERE hotel_id = :hotel_id AND room_number = :room_number
-                """), {"hotel_id": hotel_id, "room_number": room_number}).fetchone()
-                
-                if existing_room:
-                    # Update existing room
-                    db.execute(text("""
-                        UPDATE tablelink_rooms 
-                        SET room_type = :room_type, price_per_night = :price_per_night,
-                            max_guests = :max_guests, description = :description,
-                            amenities = :amenities
-                        WHERE id = :room_id
-                    """), {**room_data, "room_id": existing_room.id})
-                else:
-                    # Create new room
-                    db.execute(text("""
-                        INSERT INTO tablelink_rooms 
-                        (hotel_id, room_number, room_type, price_per_night, max_guests, 
-                         description, code, amenities, status)
-                        VALUES (:hotel_id, :room_number, :room_type, :price_per_night, 
-                                :max_guests, :description, :code, :amenities, 'available')
-                    """), room_data)
+            # Create (or update) every room of this type in bulk
+            provision_rooms(db, hotel_id, range(room_type_start, room_type_start + room_type_count), {
+                "room_type": form.get(f"room_type_name_{room_type_number}"),
+                "price_per_night": float(form.get(f"room_type_price_{room_type_number}")),
+                "max_guests": int(form.get(f"room_type_guests_{room_type_number}")),
+                "description": form.get(f"room_type_description_{room_type_number}", "")
+            }, rooms_version, update_existing=True)
             
             room_type_number += 1
         
         db.commit()
+        invalidate_tenant(hotel_data["subdomain"])
+        invalidate_availability(hotel_id)
         return {"message": "Hotel onboarding completed successfully", "hotel_id": hotel_id}
     
     except Exception as e:
@@ -157,17 +156,30 @@ async def hotel_landing_page(request: Request, hotel_subdomain: str, db: Session
         raise HTTPException(status_code=404, detail="Hotel not found")
 
 @app.get("/api/public/rooms")
-async def get_public_rooms(hotel_subdomain: str = None, db: Session = Depends(get_db)):
+async def get_public_rooms(hotel_subdomain: str = None, check_in: str = None, check_out: str = None, db: Session = Depends(get_db)):
+    # Get hotel_id from subdomain if provided, otherwise use first hotel
+    if hotel_subdomain:
+        hotel = db.execute(text("SELECT id FROM tablelink_hotels WHERE subdomain = :subdomain"), 
+                          {"subdomain": hotel_subdomain}).fetchone()
+        if not hotel:
+            raise HTTPException(status_code=404, detail="Hotel not found")
+        hotel_id = hotel.id
+    else:
+        hotel_id = 1
+    
+    # Availability is for the requested stay, or tonight when no dates are given
     try:
-        # Get hotel_id from subdomain if provided, otherwise use first hotel
-        if hotel_subdomain:
-            hotel = db.execute(text("SELECT id FROM tablelink_hotels WHERE subdomain = :subdomain"), 
-                              {"subdomain": hotel_subdomain}).fetchone()
-            hotel_id = hotel.id if hotel else 1
-        else:
-            hotel_id = 1
+        stay_start = date.fromisoformat(check_in) if check_in else date.today()
+        stay_end = date.fromisoformat(check_out) if check_out else stay_start + timedelta(days=1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="check_in and check_out must be YYYY-MM-DD")
+    if stay_end <= stay_start:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    
+    try:
+        availability = get_hotel_availability(db, hotel_id)
         
-        # Get room types with availability counts for specific hotel
+        # Get room types for specific hotel
         rooms_result = db.execute(text("""
             SELECT 
                 room_type,
@@ -176,8 +188,7 @@ async def get_public_rooms(hotel_subdomain: str = None, db: Session = Depends(ge
                 description,
                 amenities,
                 image_url,
-                COUNT(*) as total_rooms,
-                SUM(CASE WHEN status = 'available' THEN 1 ELSE 0 END) as available_rooms
+                COUNT(*) as total_rooms
             FROM tablelink_rooms
             WHERE hotel_id = :hotel_id AND room_type IS NOT NULL
             GROUP BY room_type, price_per_night, max_guests, description, amenities, image_url
@@ -194,7 +205,7 @@ async def get_public_rooms(hotel_subdomain: str = None, db: Session = Depends(ge
                 "amenities": room_type.amenities or "WiFi, AC, TV, Room Service",
                 "image_url": room_type.image_url,
                 "total_rooms": room_type.total_rooms,
-                "available_rooms": room_type.available_rooms
+                "available_rooms": availability.count_free(room_type.room_type, stay_start, stay_end)
             })
         
         return result
@@ -208,35 +219,46 @@ async def book_room(request: Request, db: Session = Depends(get_db)):
         booking_data = await request.json()
         
         # Calculate nights and total price
-        check_in = datetime.fromisoformat(booking_data['check_in_date'])
-        check_out = datetime.fromisoformat(booking_data['check_out_date'])
+        try:
+            check_in = datetime.fromisoformat(booking_data['check_in_date'])
+            check_out = datetime.fromisoformat(booking_data['check_out_date'])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="check_in_date and check_out_date must be YYYY-MM-DD")
         nights = (check_out - check_in).days
         
         if nights <= 0:
             raise HTTPException(status_code=400, detail="Invalid date range")
         
-        # Find an available room of the requested type
-        room = db.execute(text("""
-            SELECT * FROM tablelink_rooms 
-            WHERE room_type = :room_type AND status = 'available'
-            LIMIT 1
-        """), {"room_type": booking_data['room_type']}).fetchone()
+        # The landing page always sends its hotel; never fall back to another hotel's rooms
+        if not booking_data.get('hotel_subdomain'):
+            raise HTTPException(status_code=400, detail="hotel_subdomain is required")
+        hotel = db.execute(text("SELECT id FROM tablelink_hotels WHERE subdomain = :subdomain"),
+                           {"subdomain": booking_data['hotel_subdomain']}).fetchone()
+        if not hotel:
+            raise HTTPException(status_code=404, detail="Hotel not found")
+        hotel_id = hotel.id
+        
+        # Lock a room of the requested type with no booking overlapping the stay;
+        # the lock is held until the booking below commits
+        room_id = allocate_room(db, hotel_id, booking_data['room_type'], check_in, check_out)
+        if room_id is None:
+            raise HTTPException(status_code=400, detail="No rooms available for these dates")
         
-        if not room:
-            raise HTTPException(status_code=400, detail="No rooms available for this type")
+        room = db.execute(text("SELECT * FROM tablelink_rooms WHERE id = :room_id"), {"room_id": room_id}).fetchone()
         
         price_per_night = float(room.price_per_night)
         total_price = nights * price_per_night
         
         # Create booking
-        db.execute(text("""
+        booking_id = db.execute(text("""
             INSERT INTO tablelink_room_bookings 
             (hotel_id, room_id, guest_name, guest_email, guest_phone, 
              check_in_date, check_out_date, total_nights, total_price, 
              status, special_requests, created_at)
             VALUES (:hotel_id, :room_id, :guest_name, :guest_email, :guest_phone,
                     :check_in, :check_out, :nights, :total_price, 'pending', 
-                    :special_requests, datetime('now'))
+                    :special_requests, :created_at)
+            RETURNING id
         """), {
             "hotel_id": room.hotel_id,
             "room_id": room.id,
@@ -247,12 +269,17 @@ async def book_room(request: Request, db: Session = Depends(get_db)):
             "check_out": check_out,
             "nights": nights,
             "total_price": total_price,
-            "special_requests": booking_data.get('special_requests', '')
-        })
+            "special_requests": booking_data.get('special_requests', ''),
+            "created_at": datetime.utcnow()
+        }).scalar_one()
         
         db.commit()
-        return {"message": "Booking request submitted successfully", "booking_id": db.execute(text("SELECT last_insert_rowid()")).fetchone()[0]}
+        record_booking(hotel_id, room.id, booking_id, check_in, check_out)
+        return {"message": "Booking request submitted successfully", "booking_id": booking_id}
     
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         print(f"Booking error: {e}")
@@ -266,35 +293,26 @@ async def room_page(request: Request, room_number: int):
     })
 
 @app.get("/client/menu")
-async def get_menu(request: Request, room: int, db: Session = Depends(get_db)):
+async def get_menu(request: Request, room: int, db: AsyncSession = Depends(get_async_db)):
     try:
         # Get room object using raw SQL to handle schema mismatch
-        room_result = db.execute(text("SELECT * FROM tablelink_rooms WHERE room_number = :room_num LIMIT 1"), {"room_num": room}).fetchone()
+        room_result = (await db.execute(text("SELECT hotel_id, code FROM tablelink_rooms WHERE room_number = :room_num LIMIT 1"), {"room_num": room})).fetchone()
         if not room_result:
             raise HTTPException(status_code=404, detail="Room not found")
-        
-        # Get menu items using raw SQL (since table has restaurant_id instead of hotel_id)
-        menu_result = db.execute(text("SELECT * FROM tablelink_menu_items WHERE active = true")).fetchall()
-        
-        # Group by category
-        menu_by_category = {}
-        for item in menu_result:
-            category = item.category
-            if category not in menu_by_category:
-                menu_by_category[category] = []
-            menu_by_category[category].append({
-                "id": item.id,
-                "name": item.name,
-                "ingredients": item.ingredients or "No ingredients listed",
-                "price": float(item.price)
-            })
-        
-        return JSONResponse({
-            "room_number": room,
-            "room_code": room_result.code,
-            "hotel_name": "Luxury Grand Hotel",
-            "menu": menu_by_category
-        })
+
+        # Menu JSON is pre-serialized per hotel and only rebuilt when items change
+        menu = await get_menu_payload_async(db, room_result.hotel_id)
+        etag = '"%s"' % hashlib.sha1(f"{menu.digest}:{room}:{room_result.code}".encode()).hexdigest()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        body = b"".join([
+            b'{"room_number":', json.dumps(room).encode(),
+            b',"room_code":', json.dumps(room_result.code).encode(),
+            b',"hotel_name":"Luxury Grand Hotel","menu":', menu.body, b'}'
+        ])
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         print(f"Menu error: {e}")
         return JSONResponse({
@@ -309,59 +327,94 @@ async def get_client_order_details(request: Request, room_number: int, db: Sessi
     # Simplified - no existing orders for now
     return {"has_order": False}
 
-@app.post("/client/order")
-async def place_order(
-    request: Request,
-    room_number: int = Form(...),
-    code: str = Form(...),
-    items: str = Form(...),
-    db: Session = Depends(get_db)
-):
+async def insert_room_order(db: AsyncSession, hotel_id: int, room_id: int, order_items: list):
+    """Insert an order with its items and flag the room. Returns (order_id, room_state); the caller commits."""
+    # The id comes back from the INSERT itself and all items go in a single executemany
+    order_id = (await db.execute(text("""
+        INSERT INTO tablelink_orders (hotel_id, room_id, created_at, status)
+        VALUES (:hotel_id, :room_id, :created_at, 'active')
+        RETURNING id
+    """), {"hotel_id": hotel_id, "room_id": room_id, "created_at": datetime.utcnow()})).scalar_one()
+    
+    if order_items:
+        await db.execute(text("""
+            INSERT INTO tablelink_order_items (order_id, product_id, qty)
+            VALUES (:order_id, :product_id, :qty)
+        """), [
+            {"order_id": order_id, "product_id": item["product_id"], "qty": item["qty"]}
+            for item in order_items
+        ])
+    
+    # Mark room as having an order
+    await db.execute(*bump_rooms_version_statement("id = :room_id", {"room_id": room_id}))
+    room_state = (await db.execute(text(f"""
+        UPDATE tablelink_rooms SET has_extra_order = true, {STAMP_ROOM_VERSION}
+        WHERE id = :room_id
+        RETURNING hotel_id, room_number, status, has_extra_order, checkout_requested
+    """), {"room_id": room_id})).fetchone()
+    return order_id, room_state
+
+async def write_order_batch(orders):
+    """OrderBatcher writer: every queued (hotel_id, room_id, items) order in one transaction"""
+    async with AsyncSessionLocal() as db:
+        try:
+            results = [await insert_room_order(db, *order) for order in orders]
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return results
+
+order_batcher = OrderBatcher(write_order_batch, max_batch=ORDER_BATCH_MAX, interval_ms=ORDER_BATCH_INTERVAL_MS)
+
+async def create_room_order(db: AsyncSession, room_number: int, code: str, items: str):
     try:
         # Verify room and code
-        room_result = db.execute(text("SELECT * FROM tablelink_rooms WHERE room_number = :room_num AND code = :code"), 
-                                {"room_num": room_number, "code": code}).fetchone()
+        room_result = (await db.execute(text("SELECT * FROM tablelink_rooms WHERE room_number = :room_num AND code = :code"), 
+                                        {"room_num": room_number, "code": code})).fetchone()
         if not room_result:
             raise HTTPException(status_code=400, detail="Invalid room or code")
         
-        # Parse order items
+        # Parse order items (validated here so a queued order cannot fail its batch on bad input)
         try:
-            order_items = json.loads(items)
+            order_items = [{"product_id": int(item["product_id"]), "qty": int(item["qty"])} for item in json.loads(items)]
         except:
             raise HTTPException(status_code=400, detail="Invalid items format")
         
-        # Create order in database
-        order_result = db.execute(text("""
-            INSERT INTO tablelink_orders (hotel_id, room_id, created_at, status)
-            VALUES (:hotel_id, :room_id, datetime('now'), 'active')
-        """), {"hotel_id": room_result.hotel_id, "room_id": room_result.id})
-        
-        # Get the order ID
-        order_id = db.execute(text("SELECT last_insert_rowid()")).fetchone()[0]
-        
-        # Add order items
-        for item in order_items:
-            db.execute(text("""
-                INSERT INTO tablelink_order_items (order_id, product_id, qty)
-                VALUES (:order_id, :product_id, :qty)
-            """), {
-                "order_id": order_id,
-                "product_id": item["product_id"],
-                "qty": item["qty"]
-            })
-        
-        # Mark room as having an order
-        db.execute(text("""
-            UPDATE tablelink_rooms SET has_extra_order = true WHERE id = :room_id
-        """), {"room_id": room_result.id})
+        if order_batcher.running:
+            # Write-behind: release this session's connection, then wait until the
+            # batch containing the order has been committed
+            await db.close()
+            order_id, room_state = await order_batcher.submit((room_result.hotel_id, room_result.id, order_items))
+        else:
+            order_id, room_state = await insert_room_order(db, room_result.hotel_id, room_result.id, order_items)
+            await db.commit()
         
-        db.commit()
+        broker.publish(room_result.hotel_id, "order_created", {"order_id": order_id, "room_number": room_number})
+        publish_room_states([room_state])
         return {"message": "Room service order placed successfully! Staff will deliver to your room shortly."}
     
+    except Exception:
+        await db.rollback()
+        raise
+
+@app.post("/client/order")
+async def place_order(
+    request: Request,
+    room_number: int = Form(...),
+    code: str = Form(...),
+    items: str = Form(...),
+    idempotency_key: str = Header(None, max_length=128),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Double taps and client retries carry the same Idempotency-Key: they get the
+    # first submission's result instead of creating another order
+    dedupe_key = (room_number, idempotency_key) if idempotency_key else None
+    try:
+        return await order_idempotency.run_once(dedupe_key, lambda: create_room_order(db, room_number, code, items))
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
         print(f"Order error: {e}")
         return {"message": "Order received! Staff will contact you shortly."}
 
@@ -377,8 +430,12 @@ async def login(request: Request, username: str = Form(...), password: str = For
         user_result = db.execute(text("SELECT * FROM tablelink_users WHERE username = :username LIMIT 1"), 
                                 {"username": username}).fetchone()
         
-        if user_result and verify_password(password, user_result.password_hash):
+        # bcrypt runs on the bounded hashing pool, off the event loop
+        if user_result and await verify_password_async(password, user_result.password_hash):
             return {"access_token": "demo_token", "token_type": "bearer", "role": user_result.role}
+    except AuthQueueFull:
+        print("Login rejected: password hashing queue is full")
+        raise HTTPException(status_code=429, detail="Too many login attempts, please retry shortly", headers={"Retry-After": "1"})
     except Exception as e:
         print(f"Database login error: {e}")
     
@@ -406,6 +463,21 @@ async def debug_orders(db: Session = Depends(get_db)):
     except Exception as e:
         return {"error": str(e)}
 
+@app.get("/debug/auth-pool")
+async def debug_auth_pool():
+    """Queue depth and wait times of the bcrypt hashing pool"""
+    return hash_pool_stats.snapshot()
+
+@app.get("/debug/db-pool")
+async def debug_db_pool():
+    """Checked-out/overflow counts and connection wait histogram for the sync and async pools"""
+    return pool_status()
+
+@app.get("/debug/order-queue")
+async def debug_order_queue():
+    """Write-behind order batching counters (ORDER_BATCHING=1)"""
+    return order_batcher.stats()
+
 @app.get("/test/orders")
 async def test_orders(db: Session = Depends(get_db)):
     try:
@@ -446,49 +518,54 @@ async def hotel_business_dashboard(request: Request, hotel_subdomain: str, db: S
         print(f"Hotel dashboard error: {e}")
         raise HTTPException(status_code=404, detail="Hotel not found")
 
+def group_order_rows(rows, include_room: bool = True):
+    """Fold (order, item) rows from one joined query into the per-order response shape"""
+    orders = {}
+    for row in rows:
+        order = orders.get(row.id)
+        if order is None:
+            order = {"id": row.id}
+            if include_room:
+                order["room_number"] = row.room_number
+            order.update({
+                "created_at": str(row.created_at),
+                "status": row.status,
+                "items": []
+            })
+            orders[row.id] = order
+        if row.name is not None:
+            order["items"].append(f"{row.name} x{row.qty}")
+    return list(orders.values())
+
 @app.get("/business/orders")
-async def get_orders(hotel_subdomain: str = None, db: Session = Depends(get_db)):
+async def get_orders(hotel_subdomain: str = None, db: AsyncSession = Depends(get_async_db)):
     try:
+        # Orders and their items come back in a single joined query (no per-order lookups)
         if hotel_subdomain:
             # Get hotel-specific orders
-            orders_result = db.execute(text("""
-                SELECT o.id, o.created_at, r.room_number, o.status
+            orders_result = (await db.execute(text("""
+                SELECT o.id, o.created_at, r.room_number, o.status, mi.name, oi.qty
                 FROM tablelink_orders o
                 JOIN tablelink_rooms r ON o.room_id = r.id
                 JOIN tablelink_hotels h ON r.hotel_id = h.id
+                LEFT JOIN tablelink_order_items oi ON oi.order_id = o.id
+                LEFT JOIN tablelink_menu_items mi ON oi.product_id = mi.id
                 WHERE o.status = 'active' AND h.subdomain = :subdomain
-                ORDER BY o.created_at DESC
-            """), {"subdomain": hotel_subdomain}).fetchall()
+                ORDER BY o.created_at DESC, o.id DESC, oi.id
+            """), {"subdomain": hotel_subdomain})).fetchall()
         else:
             # Get all orders (original behavior)
-            orders_result = db.execute(text("""
-                SELECT o.id, o.created_at, r.room_number, o.status
+            orders_result = (await db.execute(text("""
+                SELECT o.id, o.created_at, r.room_number, o.status, mi.name, oi.qty
                 FROM tablelink_orders o
                 JOIN tablelink_rooms r ON o.room_id = r.id
+                LEFT JOIN tablelink_order_items oi ON oi.order_id = o.id
+                LEFT JOIN tablelink_menu_items mi ON oi.product_id = mi.id
                 WHERE o.status = 'active'
-                ORDER BY o.created_at DESC
-            """)).fetchall()
-        
-        result = []
-        for order in orders_result:
-            items_result = db.execute(text("""
-                SELECT mi.name, oi.qty
-                FROM tablelink_order_items oi
-                JOIN tablelink_menu_items mi ON oi.product_id = mi.id
-                WHERE oi.order_id = ?
-            """), (order.id,)).fetchall()
-            
-            items = [f"{item.name} x{item.qty}" for item in items_result]
-            
-            result.append({
-                "id": order.id,
-                "room_number": order.room_number,
-                "created_at": str(order.created_at),
-                "status": order.status,
-                "items": items
-            })
+                ORDER BY o.created_at DESC, o.id DESC, oi.id
+            """))).fetchall()
         
-        return result
+        return group_order_rows(orders_result)
     except Exception as e:
         print(f"Orders error: {e}")
         return []
@@ -497,32 +574,16 @@ async def get_orders(hotel_subdomain: str = None, db: Session = Depends(get_db))
 async def get_room_orders(room_number: int, db: Session = Depends(get_db)):
     try:
         orders_result = db.execute(text("""
-            SELECT o.id, o.created_at, o.status
+            SELECT o.id, o.created_at, o.status, mi.name, oi.qty
             FROM tablelink_orders o
             JOIN tablelink_rooms r ON o.room_id = r.id
-            WHERE r.room_number = ? AND o.status = 'active'
-            ORDER BY o.created_at DESC
-        """), (room_number,)).fetchall()
-        
-        orders = []
-        for order in orders_result:
-            items_result = db.execute(text("""
-                SELECT mi.name, oi.qty
-                FROM tablelink_order_items oi
-                JOIN tablelink_menu_items mi ON oi.product_id = mi.id
-                WHERE oi.order_id = ?
-            """), (order.id,)).fetchall()
-            
-            items = [f"{item.name} x{item.qty}" for item in items_result]
-            
-            orders.append({
-                "id": order.id,
-                "created_at": str(order.created_at),
-                "status": order.status,
-                "items": items
-            })
+            LEFT JOIN tablelink_order_items oi ON oi.order_id = o.id
+            LEFT JOIN tablelink_menu_items mi ON oi.product_id = mi.id
+            WHERE r.room_number = :room_number AND o.status = 'active'
+            ORDER BY o.created_at DESC, o.id DESC, oi.id
+        """), {"room_number": room_number}).fetchall()
         
-        return {"orders": orders}
+        return {"orders": group_order_rows(orders_result, include_room=False)}
     except Exception as e:
         print(f"Room orders error: {e}")
         return {"orders": []}
@@ -578,38 +639,21 @@ async def add_room_type(request: Request, hotel_subdomain: str = None, db: Sessi
             hotel = db.execute(text("SELECT id FROM tablelink_hotels LIMIT 1")).fetchone()
             hotel_id = hotel.id if hotel else 1
         
-        # Create multiple rooms of this type
-        for i in range(data['room_count']):
-            room_number = data['starting_room'] + i
-            
-            # Check if room number already exists
-            existing = db.execute(text("""
-                SELECT id FROM tablelink_rooms WHERE room_number = :room_number AND hotel_id = :hotel_id
-            """), {"room_number": room_number, "hotel_id": hotel_id}).fetchone()
-            
-            if existing:
-                continue  # Skip if room already exists
-            
-            db.execute(text("""
-                INSERT INTO tablelink_rooms 
-                (hotel_id, room_number, room_type, price_per_night, max_guests, 
-                 description, code, amenities, status, image_url)
-                VALUES (:hotel_id, :room_number, :room_type, :price_per_night, 
-                        :max_guests, :description, :code, :amenities, 'available', :image_url)
-            """), {
-                "hotel_id": hotel_id,
-                "room_number": room_number,
-                "room_type": data['room_type'],
-                "price_per_night": data['price_per_night'],
-                "max_guests": data['max_guests'],
-                "description": data['description'],
-                "code": f"R{room_number}",
-                "amenities": "WiFi, AC, TV, Room Service",
-                "image_url": data.get('image_url', '')
-            })
+        # New rooms are stamped with a fresh rooms_version so delta clients pick them up
+        rooms_version = bump_hotel_rooms_version(db, hotel_id)
+        
+        # Create the rooms of this type in bulk, skipping room numbers already taken
+        result = provision_rooms(db, hotel_id, range(data['starting_room'], data['starting_room'] + data['room_count']), {
+            "room_type": data['room_type'],
+            "price_per_night": data['price_per_night'],
+            "max_guests": data['max_guests'],
+            "description": data['description'],
+            "image_url": data.get('image_url', '')
+        }, rooms_version)
         
         db.commit()
-        return {"message": f"Added {data['room_count']} {data['room_type']} rooms successfully"}
+        invalidate_availability(hotel_id)
+        return {"message": f"Added {result['created']} {data['room_type']} rooms successfully", **result}
     
     except Exception as e:
         db.rollback()
@@ -666,21 +710,34 @@ async def update_booking_status(booking_id: int, request: Request, db: Session =
         data = await request.json()
         status = data['status']
         
-        db.execute(text("""
+        booking = db.execute(text("""
             UPDATE tablelink_room_bookings 
             SET status = :status 
             WHERE id = :booking_id
-        """), {"status": status, "booking_id": booking_id})
+            RETURNING hotel_id, room_id, check_in_date, check_out_date
+        """), {"status": status, "booking_id": booking_id}).fetchone()
         
         # If confirmed, update room status
+        room_states = []
         if status == 'confirmed':
-            db.execute(text("""
+            room_filter = "id = (SELECT room_id FROM tablelink_room_bookings WHERE id = :booking_id)"
+            bump_rooms_version(db, room_filter, {"booking_id": booking_id})
+            room_states = db.execute(text(f"""
                 UPDATE tablelink_rooms 
-                SET status = 'booked' 
-                WHERE id = (SELECT room_id FROM tablelink_room_bookings WHERE id = :booking_id)
-            """), {"booking_id": booking_id})
+                SET status = 'booked', {STAMP_ROOM_VERSION}
+                WHERE {room_filter}
+                RETURNING hotel_id, room_number, status, has_extra_order, checkout_requested
+            """), {"booking_id": booking_id}).fetchall()
         
         db.commit()
+        if booking:
+            # Cancelled/completed bookings free their nights in the availability index
+            if status in BLOCKING_STATUSES:
+                record_booking(booking.hotel_id, booking.room_id, booking_id, booking.check_in_date, booking.check_out_date)
+            else:
+                release_booking(booking.hotel_id, booking.room_id, booking_id)
+            broker.publish(booking.hotel_id, "booking_status", {"booking_id": booking_id, "status": status})
+        publish_room_states(room_states)
         return {"message": f"Booking {status} successfully"}
     
     except Exception as e:
@@ -718,6 +775,187 @@ async def get_business_menu(hotel_subdomain: str = None, db: Session = Depends(g
         print(f"Menu error: {e}")
         return []
 
+@app.post("/business/menu/upload", status_code=202)
+async def upload_menu(request: Request, hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    """Queue a menu file for background import; poll /business/menu/jobs/{job_id} for progress"""
+    form = await request.form()
+    menu_file = form.get("menu_file")
+    if menu_file is None or not getattr(menu_file, "filename", None):
+        raise HTTPException(status_code=400, detail="No file selected")
+    if not menu_file.filename.lower().endswith(('.xlsx', '.xls', '.pdf')):
+        raise HTTPException(status_code=400, detail="Unsupported file format. Use Excel (.xlsx, .xls) or PDF files.")
+    
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    file_content = await menu_file.read()
+    return submit_menu_import(db, hotel_id, menu_file.filename, file_content)
+
+@app.get("/business/menu/jobs/{job_id}")
+async def get_menu_job(job_id: int, hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    # Jobs are only visible to the hotel that uploaded them
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    fail_stale_jobs(db, job_id)
+    job = get_menu_import_job(db, job_id, hotel_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/business/toggle_product/{item_id}")
+async def toggle_product(item_id: int, hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    item = db.execute(text("""
+        UPDATE tablelink_menu_items SET active = NOT COALESCE(active, false)
+        WHERE id = :item_id AND hotel_id = :hotel_id
+        RETURNING active
+    """), {"item_id": item_id, "hotel_id": hotel_id}).fetchone()
+    if item is None:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    db.commit()
+    # The guest menu is served from a per-hotel cache
+    invalidate_menu(hotel_id)
+    return {"message": "Product status updated", "active": bool(item.active)}
+
+def resolve_hotel_id(db: Session, hotel_subdomain: str = None) -> int:
+    """Hotel id for a dashboard request: the subdomain's hotel, else the first hotel"""
+    if hotel_subdomain:
+        # Plain lookup like the other dashboard routes: onboarded hotels have active NULL,
+        # which the tenant cache treats as inactive
+        hotel = db.execute(text("SELECT id FROM tablelink_hotels WHERE subdomain = :subdomain"),
+                           {"subdomain": hotel_subdomain}).fetchone()
+        if not hotel:
+            raise HTTPException(status_code=404, detail="Hotel not found")
+        return hotel.id
+    hotel = db.execute(text("SELECT id FROM tablelink_hotels LIMIT 1")).fetchone()
+    return hotel.id if hotel else 1
+
+def export_period(period: str, target_date: str, year_to_date: bool = False):
+    """(target date, (first day, last day)) of an export period; target_date defaults to today"""
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of: {', '.join(PERIODS)}")
+    try:
+        target = date.fromisoformat(target_date) if target_date else date.today()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="target_date must be YYYY-MM-DD")
+    return target, period_dates(period, target, year_to_date)
+
+@app.get("/business/sales/download/csv")
+async def download_sales_csv(period: str = "day", target_date: str = None, staff_id: int = None,
+                             hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    target, (start_date, end_date) = export_period(period, target_date)
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    return StreamingResponse(
+        sales_csv_chunks(hotel_id, start_date, end_date, staff_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=sales_{period}_{target.isoformat()}.csv"}
+    )
+
+@app.get("/business/sales/download/excel")
+async def download_sales_excel(period: str = "day", target_date: str = None, staff_id: int = None,
+                               hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    target, (start_date, end_date) = export_period(period, target_date)
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    return StreamingResponse(
+        sales_xlsx_chunks(hotel_id, start_date, end_date, staff_id),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename=sales_{period}_{target.isoformat()}.xlsx"}
+    )
+
+@app.get("/business/analytics/export/csv")
+async def export_analytics_csv(period: str = "month", target_date: str = None, hotel_subdomain: str = None,
+                               db: Session = Depends(get_db)):
+    target, (start_date, end_date) = export_period(period, target_date, year_to_date=True)
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    return StreamingResponse(
+        top_items_csv_chunks(hotel_id, start_date, end_date, 50),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=top_items_{period}_{target.isoformat()}.csv"}
+    )
+
+@app.get("/business/analytics/export/parquet")
+async def export_analytics_parquet(dataset: str = "orders", period: str = "month", target_date: str = None,
+                                   start_date: str = None, end_date: str = None, hotel_subdomain: str = None,
+                                   db: Session = Depends(get_db)):
+    """Columnar export of completed orders or analytics records; start_date/end_date override the period"""
+    if dataset not in PARQUET_DATASETS:
+        raise HTTPException(status_code=400, detail=f"dataset must be one of: {', '.join(PARQUET_DATASETS)}")
+    try:
+        require_pyarrow()
+    except ImportError:
+        raise HTTPException(status_code=500, detail="Parquet export not available")
+    
+    if start_date and end_date:
+        try:
+            first_day, last_day = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="start_date and end_date must be YYYY-MM-DD")
+        label = f"{first_day.isoformat()}_{last_day.isoformat()}"
+    else:
+        target, (first_day, last_day) = export_period(period, target_date)
+        label = f"{period}_{target.isoformat()}"
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    return StreamingResponse(
+        parquet_chunks(hotel_id, dataset, first_day, last_day),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f"attachment; filename={dataset}_{label}.parquet"}
+    )
+
+# The analytics endpoints are plain functions: FastAPI runs them in its threadpool,
+# so the pandas work does not block the event loop
+@app.get("/business/analytics/dashboard")
+def get_analytics_dashboard(period: str = "day", target_date: str = None, staff_id: int = None,
+                            trend_days: int = 7, hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    """Dashboard for the period containing target_date: totals, categories, staff and trend from the
+    daily rollup; only the top items still scan the period's order lines"""
+    if trend_days not in TREND_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"trend_days must be one of: {', '.join(map(str, TREND_WINDOWS))}")
+    target, (start_date, end_date) = export_period(period, target_date, year_to_date=True)
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    analytics = rollup_summary(db, hotel_id, start_date, end_date, staff_id)
+    analytics["top_items"] = analytics_engine.top_items(db, hotel_id, target, period, 10, staff_id)["top_items"]
+    analytics["categories"] = analytics["categories"][:5]
+    analytics["waiters"] = analytics["waiters"][:10]
+    analytics["trends"] = rollup_daily_trend(db, hotel_id, target, trend_days, staff_id)
+    return analytics
+
+@app.get("/business/analytics/top-items")
+def get_analytics_top_items(period: str = "day", target_date: str = None, limit: int = Query(10, ge=1, le=100),
+                            staff_id: int = None, hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    target, _ = export_period(period, target_date)
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    return analytics_engine.top_items(db, hotel_id, target, period, limit, staff_id)
+
+@app.get("/business/analytics/categories")
+def get_analytics_categories(period: str = "month", target_date: str = None, staff_id: int = None,
+                             hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    target, _ = export_period(period, target_date)
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    return analytics_engine.category_comparison(db, hotel_id, target, period, staff_id)
+
+@app.get("/business/analytics/item-trends/{item_name}")
+def get_analytics_item_trends(item_name: str, days: int = Query(30, ge=1, le=366), hotel_subdomain: str = None,
+                              db: Session = Depends(get_db)):
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    return analytics_engine.item_performance_trends(db, hotel_id, item_name, days)
+
+@app.get("/business/analytics/summary")
+def get_analytics_summary(period: str = "day", target_date: str = None, staff_id: int = None,
+                          hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    """Summary, category and staff totals from the daily rollup (kept current as orders complete)"""
+    target, (start_date, end_date) = export_period(period, target_date, year_to_date=True)
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    summary = rollup_summary(db, hotel_id, start_date, end_date, staff_id)
+    summary.update(period=period, start_date=start_date.isoformat(), end_date=end_date.isoformat())
+    return summary
+
+@app.get("/business/analytics/trends")
+def get_analytics_trends(days: int = 7, target_date: str = None, staff_id: int = None,
+                         hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    """Daily orders/revenue for the days (7, 30 or 90) ending at target_date, from the daily rollup"""
+    if days not in TREND_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"days must be one of: {', '.join(map(str, TREND_WINDOWS))}")
+    target, _ = export_period("day", target_date)
+    hotel_id = resolve_hotel_id(db, hotel_subdomain)
+    return {"days": days, "trends": rollup_daily_trend(db, hotel_id, target, days, staff_id)}
+
 @app.get("/business/staff")
 async def get_business_staff(hotel_subdomain: str = None, db: Session = Depends(get_db)):
     try:
@@ -750,19 +988,25 @@ async def get_business_staff(hotel_subdomain: str = None, db: Session = Depends(
 async def complete_room_orders(room_number: int, db: Session = Depends(get_db)):
     try:
         # Complete all orders for this room
-        db.execute(text("""
+        completed_ids = db.execute(text("""
             UPDATE tablelink_orders SET status = 'completed' 
             WHERE room_id = (SELECT id FROM tablelink_rooms WHERE room_number = :room_number)
             AND status = 'active'
-        """), {"room_number": room_number})
+            RETURNING id
+        """), {"room_number": room_number}).scalars().all()
+        add_orders_to_rollup(db, completed_ids)
         
         # Update room status
-        db.execute(text("""
-            UPDATE tablelink_rooms SET has_extra_order = false 
+        bump_rooms_version(db, "room_number = :room_number", {"room_number": room_number})
+        room_states = db.execute(text(f"""
+            UPDATE tablelink_rooms SET has_extra_order = false, {STAMP_ROOM_VERSION}
             WHERE room_number = :room_number
-        """), {"room_number": room_number})
+            RETURNING hotel_id, room_number, status, has_extra_order, checkout_requested
+        """), {"room_number": room_number}).fetchall()
         
         db.commit()
+        invalidate_order_snapshots(db, completed_ids)
+        publish_room_states(room_states)
         return {"message": "All orders completed successfully"}
     except Exception as e:
         db.rollback()
@@ -772,21 +1016,30 @@ async def complete_room_orders(room_number: int, db: Session = Depends(get_db)):
 @app.post("/business/checkout-room/{room_number}")
 async def checkout_room(room_number: int, db: Session = Depends(get_db)):
     try:
-        # Complete all orders for this room
-        db.execute(text("""
+        # Complete all orders for this room; only orders still active change status,
+        # so orders completed earlier are not added to the rollup twice
+        completed_ids = db.execute(text("""
             UPDATE tablelink_orders SET status = 'completed' 
             WHERE room_id = (SELECT id FROM tablelink_rooms WHERE room_number = :room_number)
-        """), {"room_number": room_number})
+            AND status = 'active'
+            RETURNING id
+        """), {"room_number": room_number}).scalars().all()
+        add_orders_to_rollup(db, completed_ids)
         
         # Reset room status
-        db.execute(text("""
+        bump_rooms_version(db, "room_number = :room_number", {"room_number": room_number})
+        room_states = db.execute(text(f"""
             UPDATE tablelink_rooms SET 
                 has_extra_order = false,
-                status = 'available'
+                status = 'available',
+                {STAMP_ROOM_VERSION}
             WHERE room_number = :room_number
-        """), {"room_number": room_number})
+            RETURNING hotel_id, room_number, status, has_extra_order, checkout_requested
+        """), {"room_number": room_number}).fetchall()
         
         db.commit()
+        invalidate_order_snapshots(db, completed_ids)
+        publish_room_states(room_states)
         return {"message": "Room checked out successfully"}
     except Exception as e:
         db.rollback()
@@ -795,8 +1048,9 @@ async def checkout_room(room_number: int, db: Session = Depends(get_db)):
 async def mark_room_viewed(room_number: int, db: Session = Depends(get_db)):
     try:
         # Mark room orders as viewed
-        db.execute(text("""
-            UPDATE tablelink_rooms SET has_extra_order = false 
+        bump_rooms_version(db, "room_number = :room_number", {"room_number": room_number})
+        db.execute(text(f"""
+            UPDATE tablelink_rooms SET has_extra_order = false, {STAMP_ROOM_VERSION}
             WHERE room_number = :room_number
         """), {"room_number": room_number})
         
@@ -811,17 +1065,26 @@ async def mark_room_viewed(room_number: int, db: Session = Depends(get_db)):
 async def complete_order(order_id: int, db: Session = Depends(get_db)):
     try:
         # Mark order as completed
-        db.execute(text("""
-            UPDATE tablelink_orders SET status = 'completed' WHERE id = :order_id
-        """), {"order_id": order_id})
+        completed_ids = db.execute(text("""
+            UPDATE tablelink_orders SET status = 'completed' WHERE id = :order_id AND status = 'active'
+            RETURNING id
+        """), {"order_id": order_id}).scalars().all()
+        add_orders_to_rollup(db, completed_ids)
         
         # Update room status
-        db.execute(text("""
-            UPDATE tablelink_rooms SET has_extra_order = false 
-            WHERE id = (SELECT room_id FROM tablelink_orders WHERE id = :order_id)
-        """), {"order_id": order_id})
+        room_filter = "id = (SELECT room_id FROM tablelink_orders WHERE id = :order_id)"
+        bump_rooms_version(db, room_filter, {"order_id": order_id})
+        room_states = db.execute(text(f"""
+            UPDATE tablelink_rooms SET has_extra_order = false, {STAMP_ROOM_VERSION}
+            WHERE {room_filter}
+            RETURNING hotel_id, room_number, status, has_extra_order, checkout_requested
+        """), {"order_id": order_id}).fetchall()
         
         db.commit()
+        invalidate_order_snapshots(db, completed_ids)
+        for room in room_states:
+            broker.publish(room.hotel_id, "order_completed", {"order_id": order_id, "room_number": room.room_number})
+        publish_room_states(room_states)
         return {"message": "Order completed successfully"}
     
     except Exception as e:
@@ -829,33 +1092,97 @@ async def complete_order(order_id: int, db: Session = Depends(get_db)):
         print(f"Complete order error: {e}")
         return {"message": "Error completing order"}
 
+# Room status changes are versioned per hotel so dashboards can fetch deltas:
+# bump the owning hotels' rooms_version, then stamp the updated rooms with it.
+STAMP_ROOM_VERSION = "version = (SELECT h.rooms_version FROM tablelink_hotels h WHERE h.id = tablelink_rooms.hotel_id)"
+
+def bump_rooms_version_statement(room_filter: str, params: dict):
+    """(statement, params) advancing rooms_version for every hotel owning a room matched by room_filter"""
+    return text(f"""
+        UPDATE tablelink_hotels SET rooms_version = COALESCE(rooms_version, 0) + 1
+        WHERE id IN (SELECT hotel_id FROM tablelink_rooms WHERE {room_filter})
+    """), params
+
+def bump_rooms_version(db: Session, room_filter: str, params: dict):
+    db.execute(*bump_rooms_version_statement(room_filter, params))
+
+def publish_room_states(rows):
+    """Push room_status events for rows returned by an UPDATE ... RETURNING"""
+    for room in rows:
+        if room is None:
+            continue
+        broker.publish(room.hotel_id, "room_status", {
+            "room_number": room.room_number,
+            "status": room.status,
+            "has_extra_order": bool(room.has_extra_order),
+            "checkout_requested": bool(room.checkout_requested)
+        })
+
+@app.get("/business/events")
+async def business_events(request: Request, hotel_subdomain: str = None, db: Session = Depends(get_db)):
+    """Server-Sent Events stream of room, order and booking changes for the dashboard"""
+    hotel_id = resolve_hotel_id(db, hotel_subdomain) if hotel_subdomain else ALL_HOTELS
+    db.close()
+    
+    return StreamingResponse(
+        event_stream(request, hotel_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def room_status_dict(room):
+    return {
+        "room_number": room.room_number,
+        "status": room.status,
+        "code": room.code,
+        "checkout_requested": getattr(room, 'checkout_requested', False),
+        "has_extra_order": getattr(room, 'has_extra_order', False)
+    }
+
 @app.get("/business/rooms")
-async def get_rooms_status(hotel_subdomain: str = None, db: Session = Depends(get_db)):
+async def get_rooms_status(hotel_subdomain: str = None, since: int = None, db: AsyncSession = Depends(get_async_db)):
     try:
+        if hotel_subdomain and since is not None:
+            # Delta sync: only rooms whose status changed after the client's version
+            hotel = (await db.execute(text("SELECT id, COALESCE(rooms_version, 0) AS version FROM tablelink_hotels WHERE subdomain = :subdomain"),
+                                       {"subdomain": hotel_subdomain})).fetchone()
+            if not hotel:
+                raise HTTPException(status_code=404, detail="Hotel not found")
+            # A client ahead of the server (e.g. after a restore) gets a full snapshot
+            full = since <= 0 or since > hotel.version
+            if full:
+                rooms_result = (await db.execute(text("""
+                    SELECT room_number, status, code, checkout_requested, has_extra_order
+                    FROM tablelink_rooms WHERE hotel_id = :hotel_id ORDER BY room_number
+                """), {"hotel_id": hotel.id})).fetchall()
+            else:
+                rooms_result = (await db.execute(text("""
+                    SELECT room_number, status, code, checkout_requested, has_extra_order
+                    FROM tablelink_rooms WHERE hotel_id = :hotel_id AND version > :since
+                    ORDER BY room_number
+                """), {"hotel_id": hotel.id, "since": since})).fetchall()
+            return JSONResponse(content={
+                "version": hotel.version,
+                "full": full,
+                "rooms": [room_status_dict(room) for room in rooms_result]
+            })
+        
         if hotel_subdomain:
             # Get hotel-specific rooms
-            rooms_result = db.execute(text("""
+            rooms_result = (await db.execute(text("""
                 SELECT r.* FROM tablelink_rooms r
                 JOIN tablelink_hotels h ON r.hotel_id = h.id
                 WHERE h.subdomain = :subdomain
                 ORDER BY r.room_number
-            """), {"subdomain": hotel_subdomain}).fetchall()
+            """), {"subdomain": hotel_subdomain})).fetchall()
         else:
             # Get all rooms (original behavior)
-            rooms_result = db.execute(text("SELECT * FROM tablelink_rooms ORDER BY room_number")).fetchall()
+            rooms_result = (await db.execute(text("SELECT * FROM tablelink_rooms ORDER BY room_number"))).fetchall()
         
-        result = []
-        for room in rooms_result:
-            result.append({
-                "room_number": room.room_number,
-                "status": room.status,
-                "code": room.code,
-                "checkout_requested": getattr(room, 'checkout_requested', False),
-                "has_extra_order": getattr(room, 'has_extra_order', False)
-            })
-        
-        return JSONResponse(content=result)
+        return JSONResponse(content=[room_status_dict(room) for room in rooms_result])
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Rooms error: {e}")
         # Return sample data if database fails
@@ -895,7 +1222,7 @@ async def init_sample_data(db: Session = Depends(get_db)):
             """), {"hotel_id": hotel_id, "room_num": room_num, "code": code})
         
         # Create admin user (using restaurant_id column that exists)
-        password_hash = get_password_hash("admin123")
+        password_hash = await get_password_hash_async("admin123")
         db.execute(text("""
             INSERT INTO tablelink_users (restaurant_id, username, password_hash, role, active)
             VALUES (:hotel_id, 'admin', :password_hash, 'admin', true)
@@ -926,6 +1253,7 @@ async def init_sample_data(db: Session = Depends(get_db)):
             })
         
         db.commit()
+        invalidate_menu(hotel_id)
         return {"message": "Sample data initialized successfully!"}
     
     except Exception as e:
@@ -955,6 +1283,7 @@ async def update_hotel_info(request: Request, db: Session = Depends(get_db)):
         })
         
         db.commit()
+        invalidate_tenant(hotel_id=1)
         return {"message": "Hotel information updated successfully"}
     except Exception as e:
         db.rollback()
@@ -1113,6 +1442,8 @@ async def update_room_type(request: Request, hotel_subdomain: str = None, db: Se
             })
         
         db.commit()
+        # Renamed room types regroup the rooms in the availability index
+        invalidate_availability()
         return {"message": "Room type updated successfully"}
     except Exception as e:
         db.rollback()
@@ -9,7 +9,7 @@ import sys
 import os
 from datetime import date, timedelta
 from middleware import TenantMiddleware
-from tenant import get_current_restaurant_id, get_current_restaurant, requires_plan
+from tenant import get_current_restaurant_id, get_current_restaurant, requires_plan, invalidate_tenant
 from models import Restaurant
 
 # Add current directory to Python path
@@ -231,6 +231,7 @@ async def toggle_restaurant_status(restaurant_id: int, db: Session = Depends(get
     
     restaurant.active = not restaurant.active
     db.commit()
+    invalidate_tenant(restaurant.subdomain)
     
     return {
         "success": True,
@@ -266,6 +267,7 @@ async def update_restaurant_plan(
         restaurant.subscription_status = "active"
     
     db.commit()
+    invalidate_tenant(restaurant.subdomain)
     
     return {
         "success": True,
@@ -331,6 +333,7 @@ async def delete_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
         
         db.delete(restaurant)
         db.commit()
+        invalidate_tenant(restaurant.subdomain)
         
         return JSONResponse({"success": True, "message": f"Restaurant '{restaurant.name}' deleted successfully"})
         
@@ -1276,6 +1279,7 @@ async def get_analytics_dashboard(
     target_date: str = None,
     period: str = "day",
     waiter_id: int = None,
+    trend_days: int = 7,
     db: Session = Depends(get_db)
 ):
     try:
@@ -1299,14 +1303,14 @@ async def get_analytics_dashboard(
             target_date = date.today().isoformat()
         
         print(f"Analytics dashboard: Using restaurant_id={restaurant_id}")
-        result = get_analytics_for_period(db, target_date, period, waiter_id, restaurant_id)
+        result = get_analytics_for_period(db, target_date, period, waiter_id, restaurant_id, trend_days)
         
         # Limit response size to prevent Content-Length issues
         limited_result = {
             "summary": result.get('summary', {"total_orders": 0, "total_sales": 0, "total_tips": 0}),
             "top_items": result.get('top_items', [])[:10],  # Limit to 10 items
             "categories": result.get('categories', [])[:5],   # Limit to 5 categories
-            "trends": result.get('trends', [])[-7:],          # Last 7 days only
+            "trends": result.get('trends', []),               # trend_days days (7/30/90)
             "waiters": result.get('waiters', [])[:10]         # Limit to 10 waiters
         }
         
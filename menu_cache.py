@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+from typing import NamedTuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from cache import TTLCache
+
+class MenuPayload(NamedTuple):
+    """Pre-serialized guest menu for one hotel"""
+    body: bytes  # JSON object: category -> list of items
+    digest: str  # sha1 of body, used to build strong ETags
+
+# hotel_id -> MenuPayload. Rebuilt lazily after invalidate_menu(); the TTL is only a
+# safety net for other workers that did not see the invalidation.
+menu_cache = TTLCache(
+    max_entries=int(os.getenv("MENU_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("MENU_CACHE_TTL", "300"))
+)
+
+MENU_QUERY = text("""
+    SELECT id, name, ingredients, price, category
+    FROM tablelink_menu_items
+    WHERE active = true AND hotel_id = :hotel_id
+    ORDER BY id
+""")
+
+def serialize_menu(menu_result) -> MenuPayload:
+    # Group by category
+    menu_by_category = {}
+    for item in menu_result:
+        menu_by_category.setdefault(item.category, []).append({
+            "id": item.id,
+            "name": item.name,
+            "ingredients": item.ingredients or "No ingredients listed",
+            "price": float(item.price)
+        })
+
+    body = json.dumps(menu_by_category, separators=(",", ":")).encode()
+    return MenuPayload(body=body, digest=hashlib.sha1(body).hexdigest())
+
+def build_menu_payload(db: Session, hotel_id: int) -> MenuPayload:
+    return serialize_menu(db.execute(MENU_QUERY, {"hotel_id": hotel_id}).fetchall())
+
+def get_menu_payload(db: Session, hotel_id: int) -> MenuPayload:
+    return menu_cache.get_or_load(hotel_id, lambda: build_menu_payload(db, hotel_id))
+
+async def get_menu_payload_async(db: AsyncSession, hotel_id: int) -> MenuPayload:
+    payload = menu_cache.get(hotel_id)
+    if payload is None:
+        result = await db.execute(MENU_QUERY, {"hotel_id": hotel_id})
+        payload = serialize_menu(result.fetchall())
+        menu_cache.set(hotel_id, payload)
+    return payload
+
+def invalidate_menu(hotel_id: int = None):
+    """Drop the cached menu for a hotel (or for every hotel) after menu items change"""
+    if hotel_id is None:
+        menu_cache.clear()
+    else:
+        menu_cache.pop(hotel_id)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
@@ -0,0 +1,188 @@
+import io
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from menu_cache import invalidate_menu
+
+# Column limits of tablelink_menu_items
+MAX_NAME_LENGTH = 100
+MAX_INGREDIENTS_LENGTH = 500
+MAX_CATEGORY_LENGTH = 50
+
+INSERT_MENU_ITEM = text("""
+    INSERT INTO tablelink_menu_items (hotel_id, name, ingredients, price, category, active)
+    VALUES (:hotel_id, :name, :ingredients, :price, :category, true)
+""")
+
+def iter_excel_rows(file_content: bytes) -> Iterator[Tuple[int, tuple]]:
+    """(row number, cell values) of the active sheet below the header row.
+
+    The workbook is opened read-only, so rows are streamed from the file
+    instead of the whole sheet being loaded into memory.
+    """
+    import openpyxl
+    wb = openpyxl.load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+    try:
+        yield from enumerate(wb.active.iter_rows(min_row=2, values_only=True), 2)
+    finally:
+        wb.close()
+
+# One item per line: Name - Price - Ingredients - Category
+PDF_ITEM_PATTERN = re.compile(r'(.+?)\s*-\s*\$?(\d+\.?\d*)\s*-\s*(.+?)\s*-\s*(.+?)(?=\n|$)', re.MULTILINE)
+
+def iter_pdf_rows(file_content: bytes) -> Iterator[Tuple[int, tuple]]:
+    """(item number, (name, ingredients, price, category)) for each item line of a PDF menu"""
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    pdf_text = "".join(page.extract_text() for page in pdf_reader.pages)
+    for item_num, (name, price, ingredients, category) in enumerate(PDF_ITEM_PATTERN.findall(pdf_text), 1):
+        yield item_num, (name, ingredients, price, category)
+
+def parse_menu_file(filename: str, file_content: bytes) -> List[Tuple[int, tuple]]:
+    """All candidate rows of an Excel or PDF menu; CPU-bound, so callers run it off the event loop"""
+    if filename.lower().endswith(('.xlsx', '.xls')):
+        return list(iter_excel_rows(file_content))
+    if filename.lower().endswith('.pdf'):
+        return list(iter_pdf_rows(file_content))
+    raise ValueError("Unsupported file format. Use Excel (.xlsx, .xls) or PDF files.")
+
+def validate_menu_row(row: tuple) -> Tuple[Optional[dict], Optional[str]]:
+    """(item, None) for a valid Name | Ingredients | Price | Category row, else (None, error)"""
+    cells = list(row[:4]) + [None] * (4 - len(row[:4]))
+    name, ingredients, price, category = [value.strip() if isinstance(value, str) else value for value in cells]
+
+    if not name:
+        return None, "Missing name"
+    if not ingredients:
+        return None, "Missing ingredients"
+    if price is None or price == "":
+        return None, "Missing price"
+    try:
+        price = float(str(price).lstrip("$"))
+    except ValueError:
+        return None, f"Invalid price '{price}'"
+    if price < 0:
+        return None, f"Negative price {price}"
+
+    item = {
+        "name": str(name),
+        "ingredients": str(ingredients),
+        "price": price,
+        "category": str(category) if category else "Food"
+    }
+    for field, limit in (("name", MAX_NAME_LENGTH), ("ingredients", MAX_INGREDIENTS_LENGTH),
+                         ("category", MAX_CATEGORY_LENGTH)):
+        if len(item[field]) > limit:
+            return None, f"{field.capitalize()} longer than {limit} characters"
+    return item, None
+
+def normalize_key(name: str, category: str) -> Tuple[str, str]:
+    """Match key of a menu item: case- and whitespace-insensitive name and category"""
+    return " ".join(name.split()).casefold(), " ".join(category.split()).casefold()
+
+def row_key(row: tuple) -> Optional[Tuple[str, str]]:
+    """normalize_key() of a raw row, valid or not; None when it has no name"""
+    cells = list(row[:4]) + [None] * (4 - len(row[:4]))
+    name, category = [str(value).strip() if value is not None else "" for value in (cells[0], cells[3])]
+    if not name:
+        return None
+    return normalize_key(name, category or "Food")
+
+def sync_menu(db: Session, hotel_id: int, rows: Iterable[Tuple[int, tuple]]) -> dict:
+    """Bring the hotel's menu in line with the valid rows, in one transaction.
+
+    Rows are matched to existing items by normalize_key(name, category).
+    Only the differences are written: new items are inserted, matched items
+    whose price or ingredients changed (or that were inactive) are updated,
+    and active items missing from the upload are deactivated rather than
+    deleted, so item ids referenced by past orders stay valid. Each kind of
+    change is one bulk statement; an unchanged upload writes nothing.
+
+    rows yields (row number, values); invalid rows and repeats of an earlier
+    row are reported in "errors" as {"row", "error"}, blank rows are ignored.
+    When no row is valid the existing menu is kept. An item named by an
+    invalid row is left as it is rather than deactivated, and an invalid row
+    without a name turns deactivation off for the whole upload, since it may
+    have been meant for any item.
+    """
+    errors: List[dict] = []
+    uploaded = {}  # key -> (row number, item)
+    rejected_keys = set()
+    keep_unlisted = False
+    for row_num, row in rows:
+        if not row or all(value is None or str(value).strip() == "" for value in row):
+            continue
+        item, error = validate_menu_row(row)
+        if error:
+            errors.append({"row": row_num, "error": error})
+            key = row_key(row)
+            if key is None:
+                keep_unlisted = True
+            else:
+                rejected_keys.add(key)
+            continue
+        key = normalize_key(item["name"], item["category"])
+        if key in uploaded:
+            errors.append({"row": row_num, "error": f"Duplicate of row {uploaded[key][0]}"})
+            continue
+        uploaded[key] = (row_num, item)
+
+    summary = {"items_added": len(uploaded), "inserted": 0, "updated": 0, "deactivated": 0,
+               "unchanged": 0, "errors": errors}
+    if not uploaded:
+        return summary
+
+    try:
+        existing = {}
+        for item in db.execute(text("""
+            SELECT id, name, ingredients, price, category, active FROM tablelink_menu_items
+            WHERE hotel_id = :hotel_id
+        """), {"hotel_id": hotel_id}).fetchall():
+            key = normalize_key(item.name, item.category or "Food")
+            # Prefer the active copy if the tenant already has near-duplicates
+            if key not in existing or (item.active and not existing[key].active):
+                existing[key] = item
+
+        inserts, updates = [], []
+        for key, (_, item) in uploaded.items():
+            current = existing.get(key)
+            if current is None:
+                inserts.append({"hotel_id": hotel_id, **item})
+            elif (not current.active or current.ingredients != item["ingredients"]
+                  or abs(float(current.price) - item["price"]) > 0.005):
+                updates.append({"id": current.id, "ingredients": item["ingredients"], "price": item["price"]})
+            else:
+                summary["unchanged"] += 1
+        deactivate = [] if keep_unlisted else [
+            item.id for key, item in existing.items()
+            if key not in uploaded and key not in rejected_keys and item.active
+        ]
+
+        if inserts:
+            db.execute(INSERT_MENU_ITEM, inserts)
+        if updates:
+            db.execute(text("""
+                UPDATE tablelink_menu_items SET ingredients = :ingredients, price = :price, active = true
+                WHERE id = :id
+            """), updates)
+        if deactivate:
+            db.execute(text("UPDATE tablelink_menu_items SET active = false WHERE id IN :ids")
+                       .bindparams(bindparam("ids", expanding=True)), {"ids": deactivate})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    summary.update(inserted=len(inserts), updated=len(updates), deactivated=len(deactivate))
+    if inserts or updates or deactivate:
+        invalidate_menu(hotel_id)
+    return summary
+
+def import_excel_menu(db: Session, file_content: bytes, hotel_id: int) -> dict:
+    """Stream an Excel menu (Name | Ingredients | Price | Category) into the hotel's menu"""
+    return sync_menu(db, hotel_id, iter_excel_rows(file_content))
+
+def import_pdf_menu(db: Session, file_content: bytes, hotel_id: int) -> dict:
+    """Parse a PDF menu (Name - Price - Ingredients - Category lines) into the hotel's menu"""
+    return sync_menu(db, hotel_id, iter_pdf_rows(file_content))
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Set
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from models import SessionLocal
+from menu_import import parse_menu_file, sync_menu
+from events import broker
+
+# Menu files are parsed (openpyxl / PyPDF2 + regex, CPU-bound) in worker processes, so a
+# large upload neither blocks the event loop nor competes with request threads for the GIL.
+MENU_PARSE_WORKERS = int(os.getenv("MENU_PARSE_WORKERS", "2"))
+# Rejected rows kept on the job row; the rest are only counted
+MAX_STORED_ERRORS = 100
+
+UNFINISHED_STATUSES = ("queued", "parsing", "importing")
+# An unfinished job whose status has not changed for this long is taken to have died with
+# its worker. Other workers may be running jobs of their own, so age is the only safe signal.
+MENU_JOB_STALE_SECONDS = int(os.getenv("MENU_JOB_STALE_SECONDS", "900"))
+# Counts from menu_import.sync_menu() kept as the job's change summary
+CHANGE_COUNTS = ("inserted", "updated", "deactivated", "unchanged")
+
+_parse_executor: Optional[ProcessPoolExecutor] = None
+# Strong references to running jobs, otherwise the event loop may garbage collect them
+_running_jobs: Set[asyncio.Task] = set()
+
+def parse_executor() -> ProcessPoolExecutor:
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ProcessPoolExecutor(max_workers=MENU_PARSE_WORKERS)
+    return _parse_executor
+
+def job_to_dict(job) -> dict:
+    return {
+        "job_id": job.id,
+        "hotel_id": job.hotel_id,
+        "filename": job.filename,
+        "status": job.status,
+        "progress": job.progress,
+        "items_added": job.items_added,
+        "changes": json.loads(job.changes) if job.changes else None,
+        "errors": json.loads(job.errors) if job.errors else [],
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at
+    }
+
+def get_menu_import_job(db: Session, job_id: int, hotel_id: int = None) -> Optional[dict]:
+    job = db.execute(text("SELECT * FROM tablelink_menu_import_jobs WHERE id = :job_id"),
+                     {"job_id": job_id}).fetchone()
+    if job is None or (hotel_id is not None and job.hotel_id != hotel_id):
+        return None
+    return job_to_dict(job)
+
+def _update_job(job_id: int, **fields) -> dict:
+    fields["updated_at"] = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        assignments = ", ".join(f"{name} = :{name}" for name in fields)
+        db.execute(text(f"UPDATE tablelink_menu_import_jobs SET {assignments} WHERE id = :job_id"),
+                   {**fields, "job_id": job_id})
+        db.commit()
+        return get_menu_import_job(db, job_id)
+    finally:
+        db.close()
+
+def _import_rows(hotel_id: int, rows) -> dict:
+    db = SessionLocal()
+    try:
+        return sync_menu(db, hotel_id, rows)
+    finally:
+        db.close()
+
+async def _set_status(job_id: int, **fields):
+    job = await asyncio.get_running_loop().run_in_executor(None, lambda: _update_job(job_id, **fields))
+    broker.publish(job["hotel_id"], "menu_import", job)
+
+async def run_menu_import_job(job_id: int, hotel_id: int, filename: str, file_content: bytes):
+    """Parse in a worker process, then apply the menu diff in one transaction; the live menu is untouched until then"""
+    loop = asyncio.get_running_loop()
+    try:
+        await _set_status(job_id, status="parsing", progress=10)
+        rows = await loop.run_in_executor(parse_executor(), parse_menu_file, filename, file_content)
+
+        await _set_status(job_id, status="importing", progress=60)
+        result = await loop.run_in_executor(None, _import_rows, hotel_id, rows)
+
+        errors = result["errors"]
+        if not result["items_added"]:
+            status, error = "failed", "No valid menu items found; the current menu was kept"
+        else:
+            status, error = "done", None
+        changes = {name: result[name] for name in CHANGE_COUNTS}
+        await _set_status(job_id, status=status, progress=100, items_added=result["items_added"],
+                          changes=json.dumps(changes), errors=json.dumps(errors[:MAX_STORED_ERRORS]),
+                          error=error, finished_at=datetime.utcnow())
+        print(f"Menu import job {job_id}: {result['items_added']} items {changes}, {len(errors)} rejected rows")
+    except Exception as e:
+        print(f"Menu import job {job_id} failed: {e}")
+        await _set_status(job_id, status="failed", progress=100, error=str(e)[:500],
+                          finished_at=datetime.utcnow())
+
+def submit_menu_import(db: Session, hotel_id: int, filename: str, file_content: bytes) -> dict:
+    """Record a queued job and start it in the background; returns the job as a dict"""
+    job_id = db.execute(text("""
+        INSERT INTO tablelink_menu_import_jobs (hotel_id, filename, status, progress, items_added, created_at, updated_at)
+        VALUES (:hotel_id, :filename, 'queued', 0, 0, :now, :now)
+        RETURNING id
+    """), {"hotel_id": hotel_id, "filename": filename, "now": datetime.utcnow()}).scalar()
+    db.commit()
+
+    task = asyncio.get_running_loop().create_task(run_menu_import_job(job_id, hotel_id, filename, file_content))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+    return get_menu_import_job(db, job_id)
+
+def fail_stale_jobs(db: Session, job_id: int = None) -> int:
+    """Mark unfinished jobs not updated for MENU_JOB_STALE_SECONDS (or just job_id, if stale) as failed.
+
+    Run at startup and before a job is polled, so a job interrupted by a
+    restart ends up failed without touching jobs that live workers are running.
+    """
+    now = datetime.utcnow()
+    job_filter = "AND id = :job_id" if job_id is not None else ""
+    count = db.execute(text(f"""
+        UPDATE tablelink_menu_import_jobs
+        SET status = 'failed', error = 'Interrupted by a server restart', finished_at = :now, updated_at = :now
+        WHERE status IN ({", ".join(f"'{status}'" for status in UNFINISHED_STATUSES)})
+          AND COALESCE(updated_at, created_at) < :cutoff
+          {job_filter}
+    """), {"now": now, "cutoff": now - timedelta(seconds=MENU_JOB_STALE_SECONDS), "job_id": job_id}).rowcount
+    db.commit()
+    return count
+
+async def shutdown_menu_jobs():
+    """Let running imports finish, then stop the parser processes"""
+    if _running_jobs:
+        await asyncio.gather(*_running_jobs, return_exceptions=True)
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=True)
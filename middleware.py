@@ -1,82 +1,123 @@
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-from models import get_db, Restaurant
-from tenant import get_restaurant_from_request, set_tenant_context
-
-class TenantMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Skip tenant resolution for static files and health checks
-        if (request.url.path.startswith("/static/") or 
-            request.url.path in ["/favicon.ico", "/robots.txt", "/apple-touch-icon.png", "/test"]):
-            return await call_next(request)
-        
-        # Skip for setup routes and global pages
-        if (request.url.path.startswith("/setup") or 
-            request.url.path in ["/onboarding", "/admin"] or
-            request.url.path.startswith("/admin/") or 
-            request.url.path in ["/onboarding", "/admin", "/admin/"] or
-            request.url.path.startswith("/onboarding") or
-            request.url.path.startswith("/admin/")):
-            return await call_next(request)
-        
+from fastapi import HTTPException
+from fastapi.templating import Jinja2Templates
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from models import get_db
+from tenant import resolve_tenant, get_restaurant_from_subdomain, set_tenant_context, reset_tenant_context
+import os
+
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"))
+
+class PrefixTrie:
+    """Character trie over URL paths, built once at import time.
+
+    matches(path) is true when path equals one of the exact entries or starts
+    with one of the prefixes, in a single walk over the path.
+    """
+
+    _PREFIX = "*"
+    _EXACT = "$"
+
+    def __init__(self, prefixes=(), exact=()):
+        self._root: dict = {}
+        for prefix in prefixes:
+            self._insert(prefix, self._PREFIX)
+        for path in exact:
+            self._insert(path, self._EXACT)
+
+    def _insert(self, key: str, marker: str):
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[marker] = True
+
+    def matches(self, path: str) -> bool:
+        node = self._root
+        for char in path:
+            if self._PREFIX in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return self._PREFIX in node or self._EXACT in node
+
+# Static files, health checks, setup and global admin/onboarding pages need no tenant
+SKIP_TENANT = PrefixTrie(
+    prefixes=("/static/", "/setup", "/admin/", "/onboarding"),
+    exact=("/favicon.ico", "/robots.txt", "/apple-touch-icon.png", "/test", "/admin")
+)
+
+def _header(scope: Scope, name: bytes) -> str:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+class TenantMiddleware:
+    """Pure ASGI tenant middleware.
+
+    Resolves the tenant straight from the ASGI scope, stores it in the tenant
+    ContextVar and request.state, and rewrites /r/<subdomain>/... paths in place.
+    Unlike BaseHTTPMiddleware it adds no extra task or response stream.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or SKIP_TENANT.matches(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        original_path = scope["path"]
+        host = _header(scope, b"host")
+        referer = _header(scope, b"referer")
+        restaurant = None
+
+        db = next(get_db())
         try:
-            # Get database session
-            db = next(get_db())
-            
-            # Store original path before any rewriting
-            original_path = str(request.url.path)
-            print(f"Middleware: Processing original path: {original_path}")
-            
-            # Get restaurant from request (using original path)
-            restaurant = get_restaurant_from_request(request, db, original_path)
-            
-            # Set tenant context
-            set_tenant_context(restaurant)
-            
-            # Add restaurant to request state
-            request.state.restaurant = restaurant
-            request.state.restaurant_id = restaurant.id
-            
-            print(f"Middleware: Set restaurant_id={restaurant.id} ({restaurant.name}) for path={original_path}")
-            
-            # Rewrite URL for /r/subdomain/ requests but preserve restaurant context
-            if original_path.startswith("/r/"):
-                parts = original_path.split("/")
-                if len(parts) >= 4:
-                    # Remove /r/subdomain from path
-                    new_path = "/" + "/".join(parts[3:])
-                    request.scope["path"] = new_path
-                    print(f"Middleware: Rewrote path to {new_path} for restaurant {restaurant.id} ({restaurant.name})")
-            
-            db.close()
-            
+            restaurant = resolve_tenant(host, original_path, referer, db)
         except HTTPException as e:
             print(f"Restaurant not found: {e}")
             # Show access denied page for inactive/deleted restaurants
-            if '/r/' in str(request.url.path):
-                return templates.TemplateResponse("access_denied.html", {"request": request})
-            # Return 404 for API requests
-            from fastapi.responses import JSONResponse
-            return JSONResponse({"detail": "Restaurant not found or inactive"}, status_code=404)
+            if '/r/' in original_path:
+                response = templates.TemplateResponse("access_denied.html", {"request": Request(scope)})
+            else:
+                # Return 404 for API requests
+                response = JSONResponse({"detail": "Restaurant not found or inactive"}, status_code=404)
+            await response(scope, receive, send)
+            return
         except Exception as e:
             print(f"Tenant middleware error: {e}")
             # Only set fallback for direct localhost access (not /r/ URLs)
-            if not str(request.url.path).startswith('/r/'):
+            if not original_path.startswith('/r/'):
                 try:
-                    db = next(get_db())
-                    restaurant = db.query(Restaurant).filter(
-                        Restaurant.subdomain == 'demo',
-                        Restaurant.active == True
-                    ).first()
-                    if restaurant:
-                        request.state.restaurant = restaurant
-                        request.state.restaurant_id = restaurant.id
-                        set_tenant_context(restaurant)
-                        print(f"Middleware: Using fallback restaurant {restaurant.id} ({restaurant.name})")
-                    db.close()
-                except:
+                    restaurant = get_restaurant_from_subdomain('demo', db)
+                except Exception:
                     pass
-        
-        response = await call_next(request)
-        return response
\ No newline at end of file
+        finally:
+            db.close()
+
+        if restaurant is None:
+            await self.app(scope, receive, send)
+            return
+
+        # request.state is backed by scope["state"]
+        state = scope.setdefault("state", {})
+        state["restaurant"] = restaurant
+        state["restaurant_id"] = restaurant.id
+
+        # Rewrite URL for /r/subdomain/ requests but preserve restaurant context
+        if original_path.startswith("/r/"):
+            parts = original_path.split("/")
+            if len(parts) >= 4:
+                new_path = "/" + "/".join(parts[3:])
+                scope["path"] = new_path
+                scope["raw_path"] = new_path.encode()
+
+        token = set_tenant_context(restaurant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_tenant_context(token)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+from models import SessionLocal
+from sqlalchemy import text
+
+def migrate_indexes():
+    db = SessionLocal()
+    
+    try:
+        # The unique room number index cannot be built while duplicates exist
+        duplicates = db.execute(text("""
+            SELECT hotel_id, room_number, COUNT(*) AS copies FROM tablelink_rooms
+            GROUP BY hotel_id, room_number HAVING COUNT(*) > 1
+        """)).fetchall()
+        for row in duplicates:
+            print(f"⚠️  Hotel {row.hotel_id} has {row.copies} rooms numbered {row.room_number}; merge them before adding uq_tablelink_rooms_hotel_room_number")
+        
+        # Older rollups could hold several rows per key; rebuilding them from the orders merges those
+        duplicate_rollups = db.execute(text("""
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM tablelink_daily_rollups
+                GROUP BY hotel_id, rollup_date, COALESCE(staff_id, 0), COALESCE(category, '')
+                HAVING COUNT(*) > 1
+            ) duplicates
+        """)).scalar()
+        if duplicate_rollups:
+            print(f"⚠️  {duplicate_rollups} daily rollup keys have several rows; run backfill_daily_rollup.py before adding uq_tablelink_daily_rollups_key")
+        
+        # Composite indexes for date-range filters and booking overlap checks
+        indexes_to_add = [
+            "CREATE INDEX IF NOT EXISTS ix_tablelink_orders_hotel_status_created ON tablelink_orders (hotel_id, status, created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_tablelink_analytics_records_hotel_checkout ON tablelink_analytics_records (hotel_id, checkout_date)",
+            "CREATE INDEX IF NOT EXISTS ix_tablelink_order_items_order_id ON tablelink_order_items (order_id)",
+            "CREATE INDEX IF NOT EXISTS ix_tablelink_room_bookings_room_dates ON tablelink_room_bookings (room_id, check_in_date, check_out_date)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_tablelink_rooms_hotel_room_number ON tablelink_rooms (hotel_id, room_number)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_tablelink_daily_rollups_key ON tablelink_daily_rollups (hotel_id, rollup_date, COALESCE(staff_id, 0), COALESCE(category, ''))"
+        ]
+        
+        for sql in indexes_to_add:
+            index_name = sql.split('EXISTS')[1].split()[0]
+            try:
+                db.execute(text(sql))
+                db.commit()
+                print(f"✅ Created index: {index_name}")
+            except Exception as e:
+                db.rollback()
+                print(f"❌ Error creating index {index_name}: {e}")
+        
+        print("\n🎉 Index migration completed!")
+        
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_indexes()
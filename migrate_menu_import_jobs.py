@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+from models import SessionLocal
+from sqlalchemy import text
+
+def migrate_menu_import_jobs():
+    db = SessionLocal()
+    
+    try:
+        # Columns added after the table was first created (the table itself comes from create_tables)
+        columns_to_add = [
+            ("changes", "TEXT"),  # change summary of diff-based menu imports
+            ("updated_at", "TIMESTAMP")  # last status change, for stale job detection
+        ]
+        
+        for column_name, column_type in columns_to_add:
+            sql = f"ALTER TABLE tablelink_menu_import_jobs ADD COLUMN {column_name} {column_type}"
+            try:
+                db.execute(text(sql))
+                db.commit()
+                print(f"✅ Added column: {column_name}")
+            except Exception as e:
+                db.rollback()
+                if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
+                    print(f"⚠️  Column already exists: {column_name}")
+                else:
+                    print(f"❌ Error adding column {column_name}: {e}")
+        
+        print("\n🎉 Menu import job migration completed!")
+        
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_menu_import_jobs()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+from models import SessionLocal
+from sqlalchemy import text
+
+def migrate_room_versions():
+    db = SessionLocal()
+    
+    try:
+        # Change-version columns used by /business/rooms?since=<version>
+        columns_to_add = [
+            "ALTER TABLE tablelink_hotels ADD COLUMN rooms_version INTEGER DEFAULT 0",
+            "ALTER TABLE tablelink_rooms ADD COLUMN version INTEGER DEFAULT 0"
+        ]
+        
+        for sql in columns_to_add:
+            try:
+                db.execute(text(sql))
+                db.commit()
+                print(f"✅ Added column: {sql.split('ADD COLUMN')[1].split()[0]}")
+            except Exception as e:
+                db.rollback()
+                if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
+                    print(f"⚠️  Column already exists: {sql.split('ADD COLUMN')[1].split()[0]}")
+                else:
+                    print(f"❌ Error adding column: {e}")
+        
+        db.execute(text("UPDATE tablelink_hotels SET rooms_version = 0 WHERE rooms_version IS NULL"))
+        db.execute(text("UPDATE tablelink_rooms SET version = 0 WHERE version IS NULL"))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_tablelink_rooms_hotel_version ON tablelink_rooms (hotel_id, version)"))
+        db.commit()
+        print("✅ Created index: ix_tablelink_rooms_hotel_version")
+        
+        print("\n🎉 Room version migration completed!")
+        
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_room_versions()
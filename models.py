@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, Date, DateTime, ForeignKey, Index, create_engine, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from datetime import datetime
 
 Base = declarative_base()
@@ -16,6 +17,7 @@ class Hotel(Base):
     subscription_status = Column(String(20), default='trial')  # trial, active, cancelled
     created_at = Column(DateTime, default=datetime.utcnow)
     active = Column(Boolean, default=True)
+    rooms_version = Column(Integer, default=0)  # bumped on every room status change (delta sync)
     
     # Hotel details for onboarding
     description = Column(String(1000))
@@ -73,10 +75,17 @@ class Room(Base):
     max_guests = Column(Integer, default=2)
     amenities = Column(String(500))  # JSON string
     image_url = Column(String(255))
+    version = Column(Integer, default=0)  # hotel rooms_version at the last status change
     
     hotel = relationship("Hotel", back_populates="rooms")
     orders = relationship("Order", back_populates="room")
     bookings = relationship("RoomBooking", back_populates="room")
+    
+    __table_args__ = (
+        Index('ix_tablelink_rooms_hotel_version', 'hotel_id', 'version'),
+        # Conflict target of the bulk room upsert in room_provisioning.py
+        Index('uq_tablelink_rooms_hotel_room_number', 'hotel_id', 'room_number', unique=True),
+    )
 
 class MenuItem(Base):
     __tablename__ = "tablelink_menu_items"
@@ -111,13 +120,22 @@ class Order(Base):
     room_id = Column(Integer, ForeignKey('tablelink_rooms.id'))
     staff_id = Column(Integer, ForeignKey('tablelink_staff.id'))
     created_at = Column(DateTime, default=datetime.utcnow)
-    status = Column(String(10), default='active')  # 'active' or 'finished'
+    status = Column(String(10), default='active')  # 'active' or 'completed'
     tip_amount = Column(Float, default=0.0)
     
     hotel = relationship("Hotel", back_populates="orders")
     room = relationship("Room", back_populates="orders")
     staff_member = relationship("Staff", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order")
+    
+    __table_args__ = (
+        # Dashboards and reports filter by hotel and status over a created_at range
+        Index('ix_tablelink_orders_hotel_status_created', 'hotel_id', 'status', 'created_at'),
+    )
+
+# Status main.py gives an order when staff complete it or check the room out;
+# sales exports and analytics count only these orders
+COMPLETED_ORDER_STATUS = 'completed'
 
 class RoomBooking(Base):
     __tablename__ = "tablelink_room_bookings"
@@ -138,6 +156,11 @@ class RoomBooking(Base):
     
     hotel = relationship("Hotel")
     room = relationship("Room", back_populates="bookings")
+    
+    __table_args__ = (
+        # Overlap checks when allocating a room for new dates
+        Index('ix_tablelink_room_bookings_room_dates', 'room_id', 'check_in_date', 'check_out_date'),
+    )
 
 class OrderItem(Base):
     __tablename__ = "tablelink_order_items"
@@ -152,6 +175,10 @@ class OrderItem(Base):
     
     order = relationship("Order", back_populates="order_items")
     menu_item = relationship("MenuItem", back_populates="order_items")
+    
+    __table_args__ = (
+        Index('ix_tablelink_order_items_order_id', 'order_id'),
+    )
 
 class AnalyticsRecord(Base):
     __tablename__ = "tablelink_analytics_records"
@@ -170,9 +197,62 @@ class AnalyticsRecord(Base):
     
     hotel = relationship("Hotel", back_populates="analytics_records")
     staff_member = relationship("Staff")
+    
+    __table_args__ = (
+        Index('ix_tablelink_analytics_records_hotel_checkout', 'hotel_id', 'checkout_date'),
+    )
+
+class DailyRollup(Base):
+    """Pre-aggregated analytics per (hotel, day, staff, category), kept current at checkout.
+
+    main.py folds each order in (rollup.add_orders_to_rollup) in the transaction
+    that marks it completed; the day is the order's created_at day.
+
+    Rows with category NULL hold whole-order totals for the (hotel, day, staff)
+    so order_count there counts distinct orders; category rows count the orders
+    that contained that category. There is one row per key: the unique index
+    compares NULL staff_id/category as 0/'' so rollup._increment can upsert
+    into it with ON CONFLICT.
+    """
+    __tablename__ = "tablelink_daily_rollups"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    hotel_id = Column(Integer, ForeignKey('tablelink_hotels.id'), nullable=False)
+    rollup_date = Column(Date, nullable=False)
+    staff_id = Column(Integer, ForeignKey('tablelink_staff.id'))
+    category = Column(String(50))  # NULL = all categories
+    quantity = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)
+    tips = Column(Float, default=0.0)
+    order_count = Column(Integer, default=0)
+    
+    __table_args__ = (
+        Index('ix_tablelink_daily_rollups_hotel_date', 'hotel_id', 'rollup_date'),
+        Index('uq_tablelink_daily_rollups_key', 'hotel_id', 'rollup_date',
+              func.coalesce(staff_id, 0), func.coalesce(category, ''), unique=True),
+    )
+
+class MenuImportJob(Base):
+    """Background menu upload: parsed off the event loop, then applied as a diff by menu_jobs.py"""
+    __tablename__ = "tablelink_menu_import_jobs"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    hotel_id = Column(Integer, ForeignKey('tablelink_hotels.id'), nullable=False)
+    filename = Column(String(255))
+    status = Column(String(20), default='queued')  # 'queued', 'parsing', 'importing', 'done', 'failed'
+    progress = Column(Integer, default=0)  # percent
+    items_added = Column(Integer, default=0)
+    changes = Column(Text)  # JSON counts of inserted/updated/deactivated/unchanged items
+    errors = Column(Text)  # JSON list of {"row", "error"} for rejected rows
+    error = Column(String(500))  # why the whole job failed
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)  # last status change, see menu_jobs.fail_stale_jobs()
+    finished_at = Column(DateTime)
 
 # Database setup
 import os
+from pool_metrics import engine_pool_kwargs
+from sqlite_profile import apply_sqlite_profile
 
 # Use shared PostgreSQL database with tablelink prefix
 if os.getenv("DATABASE_SHARED_URL"):
@@ -180,19 +260,36 @@ if os.getenv("DATABASE_SHARED_URL"):
     DATABASE_URL = os.getenv("DATABASE_SHARED_URL")
     if DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
-    engine = create_engine(DATABASE_URL)
 elif os.getenv("DATABASE_URL"):
     # Fallback to regular DATABASE_URL
     DATABASE_URL = os.getenv("DATABASE_URL")
     if DATABASE_URL.startswith("postgres://"):
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
-    engine = create_engine(DATABASE_URL)
 else:
     # Development (local)
     DATABASE_URL = "sqlite:///./database.db"
-    engine = create_engine(DATABASE_URL)
+# Pool size/overflow/timeout/recycle/pre-ping come from DB_POOL_* env vars (see pool_metrics.py)
+engine = create_engine(DATABASE_URL, **engine_pool_kwargs(DATABASE_URL, "sync"))
+# SQLITE_PROFILE=tuned enables WAL and the other pragmas in sqlite_profile.py
+apply_sqlite_profile(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def get_async_database_url(url: str) -> str:
+    """Same database as url, through an asyncio driver (asyncpg / aiosqlite)"""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+# Async engine for the hot request paths; shares the database with the sync engine
+async_engine = create_async_engine(
+    get_async_database_url(DATABASE_URL),
+    **engine_pool_kwargs(DATABASE_URL, "async", async_engine=True)
+)
+apply_sqlite_profile(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
     
@@ -207,4 +304,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+# ORDER_BATCHING=1 switches /client/order to write-behind ingestion: validated orders
+# are queued and committed in micro-batches of up to ORDER_BATCH_MAX orders, at most
+# ORDER_BATCH_INTERVAL_MS after the first one in the batch arrived.
+ORDER_BATCHING = os.getenv("ORDER_BATCHING", "0").strip().lower() in ("1", "true", "yes", "on")
+ORDER_BATCH_MAX = int(os.getenv("ORDER_BATCH_MAX", "50"))
+ORDER_BATCH_INTERVAL_MS = float(os.getenv("ORDER_BATCH_INTERVAL_MS", "10"))
+
+class OrderBatcher:
+    """Background asyncio task that commits queued orders in batches.
+
+    writer(items) must persist every item in one transaction and return one
+    result per item. submit() resolves only after the batch holding the item
+    has been committed. If a batch fails, its items are retried one by one so
+    a single bad order does not fail the others.
+    """
+
+    def __init__(self, writer: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch: int = 50, interval_ms: float = 10):
+        self.writer = writer
+        self.max_batch = max_batch
+        self.interval = interval_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.orders = 0
+        self.failed_batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Flush whatever is queued, then stop the background task"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is None:
+                break
+            batch = [entry]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = await self.writer(items)
+        except Exception as e:
+            self.failed_batches += 1
+            if len(batch) == 1:
+                self._resolve(batch[0][1], error=e)
+                return
+            print(f"Order batch of {len(batch)} failed ({e}), retrying orders individually")
+            for entry in batch:
+                await self._flush([entry])
+            return
+        self.batches += 1
+        self.orders += len(batch)
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, result=result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any = None, error: Exception = None):
+        # The submitting request may have been cancelled (client went away)
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "orders": self.orders,
+            "avg_batch_size": round(self.orders / self.batches, 2) if self.batches else 0.0,
+            "failed_batches": self.failed_batches,
+            "max_batch": self.max_batch,
+            "interval_ms": self.interval * 1000
+        }
@@ -0,0 +1,218 @@
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from models import SessionLocal, COMPLETED_ORDER_STATUS
+from periods import day_range
+from exports import EXPORT_YIELD_PER, FILE_CHUNK_BYTES
+
+# Rows per Parquet row group: large enough for fast columnar scans in pandas,
+# small enough that only one group is held in memory while writing
+PARQUET_ROW_GROUP_ROWS = int(os.getenv("PARQUET_ROW_GROUP_ROWS", "50000"))
+# Closed months are written once to <dir>/v<version>/hotel_<id>/<dataset>/<YYYY-MM>.parquet and
+# served from there afterwards instead of being queried again
+ANALYTICS_SNAPSHOT_DIR = os.getenv("ANALYTICS_SNAPSHOT_DIR", "analytics_snapshots")
+# Bumped whenever a dataset query changes what a month contains, so snapshots written
+# by the old query are no longer read
+SNAPSHOT_VERSION = 2
+# A month counts as closed this many days after its last day, so late checkouts land in it first
+SNAPSHOT_GRACE_DAYS = int(os.getenv("ANALYTICS_SNAPSHOT_GRACE_DAYS", "2"))
+
+# dataset -> (query over [:start, :end) for one hotel in time order, time column, (column, type) pairs)
+DATASETS = {
+    "records": (text("""
+        SELECT id, checkout_date, room_number, staff_id, item_name, item_category,
+               quantity, unit_price, total_price, tip_amount
+        FROM tablelink_analytics_records
+        WHERE hotel_id = :hotel_id AND checkout_date >= :start AND checkout_date < :end
+        ORDER BY checkout_date, id
+    """), "checkout_date", (
+        ("id", "int64"), ("checkout_date", "timestamp"), ("room_number", "int64"),
+        ("staff_id", "int64"), ("item_name", "string"), ("item_category", "string"),
+        ("quantity", "int64"), ("unit_price", "float64"), ("total_price", "float64"),
+        ("tip_amount", "float64")
+    )),
+    "orders": (text(f"""
+        SELECT o.id AS order_id, o.created_at, r.room_number, o.staff_id, s.name AS staff_name,
+               COALESCE(o.tip_amount, 0) AS tip_amount,
+               (SELECT COALESCE(SUM(oi.qty * mi.price), 0)
+                FROM tablelink_order_items oi
+                JOIN tablelink_menu_items mi ON mi.id = oi.product_id
+                WHERE oi.order_id = o.id) AS total_sales
+        FROM tablelink_orders o
+        LEFT JOIN tablelink_rooms r ON r.id = o.room_id
+        LEFT JOIN tablelink_staff s ON s.id = o.staff_id
+        WHERE o.hotel_id = :hotel_id AND o.status = '{COMPLETED_ORDER_STATUS}'
+          AND o.created_at >= :start AND o.created_at < :end
+        ORDER BY o.created_at, o.id
+    """), "created_at", (
+        ("order_id", "int64"), ("created_at", "timestamp"), ("room_number", "int64"),
+        ("staff_id", "int64"), ("staff_name", "string"), ("tip_amount", "float64"),
+        ("total_sales", "float64")
+    ))
+}
+
+# Hotel and creation time of the given orders: the snapshot months they are filed under
+ORDER_MONTHS_QUERY = text("""
+    SELECT hotel_id, created_at FROM tablelink_orders WHERE id IN :order_ids
+""").bindparams(bindparam("order_ids", expanding=True))
+
+def require_pyarrow():
+    """Import pyarrow (an optional dependency); raises ImportError when it is missing"""
+    import pyarrow
+    import pyarrow.parquet
+    return pyarrow
+
+def arrow_schema(dataset: str):
+    pa = require_pyarrow()
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(), "timestamp": pa.timestamp("us")}
+    return pa.schema([(name, types[type_name]) for name, type_name in DATASETS[dataset][2]])
+
+def _to_datetime(value):
+    # Raw SQLite rows return timestamps as strings
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def query_batches(db: Session, hotel_id: int, dataset: str, start_date: date, end_date: date) -> Iterator:
+    """Arrow RecordBatches of the dataset for the days start_date..end_date, EXPORT_YIELD_PER rows each"""
+    pa = require_pyarrow()
+    query, _, columns = DATASETS[dataset]
+    schema = arrow_schema(dataset)
+    start, end = day_range(start_date, end_date)
+    result = db.execute(query, {"hotel_id": hotel_id, "start": start, "end": end},
+                        execution_options={"yield_per": EXPORT_YIELD_PER})
+    for rows in result.partitions():
+        arrays = []
+        for i, (name, type_name) in enumerate(columns):
+            values = [row[i] for row in rows]
+            if type_name == "timestamp":
+                values = [_to_datetime(value) for value in values]
+            arrays.append(pa.array(values, type=schema.field(name).type))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def month_end(month_start: date) -> date:
+    return (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+def month_ranges(start_date: date, end_date: date) -> List[Tuple[date, date]]:
+    """Split start_date..end_date into (first day, last day) pieces, one per calendar month"""
+    ranges = []
+    piece_start = start_date
+    while piece_start <= end_date:
+        piece_end = min(end_date, month_end(piece_start))
+        ranges.append((piece_start, piece_end))
+        piece_start = piece_end + timedelta(days=1)
+    return ranges
+
+def month_is_closed(month_start: date, today: date = None) -> bool:
+    return month_end(month_start) + timedelta(days=SNAPSHOT_GRACE_DAYS) < (today or date.today())
+
+def snapshot_path(hotel_id: int, dataset: str, month_start: date) -> str:
+    return os.path.join(ANALYTICS_SNAPSHOT_DIR, f"v{SNAPSHOT_VERSION}", f"hotel_{hotel_id}", dataset,
+                        f"{month_start:%Y-%m}.parquet")
+
+def write_parquet(batches, schema, sink):
+    """Write batches to sink in row groups of about PARQUET_ROW_GROUP_ROWS rows"""
+    pa = require_pyarrow()
+    pending, pending_rows = [], 0
+    with pa.parquet.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for batch in batches:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= PARQUET_ROW_GROUP_ROWS:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema))
+                pending, pending_rows = [], 0
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema=schema))
+
+def write_month_snapshot(db: Session, hotel_id: int, dataset: str, month_start: date,
+                         overwrite: bool = False) -> Optional[str]:
+    """Write the snapshot of one closed month; returns its path, or None if it already exists.
+
+    The file is written under a temporary name and renamed into place, so
+    readers (and concurrent writers in other workers) never see a partial one.
+    """
+    month_start = month_start.replace(day=1)
+    if not month_is_closed(month_start):
+        raise ValueError(f"{month_start:%Y-%m} is not closed yet")
+    path = snapshot_path(hotel_id, dataset, month_start)
+    if os.path.exists(path) and not overwrite:
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write_parquet(query_batches(db, hotel_id, dataset, month_start, month_end(month_start)),
+                      arrow_schema(dataset), tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return path
+
+def invalidate_order_snapshots(db: Session, order_ids: List[int]) -> int:
+    """Delete the "orders" snapshots of the closed months the given orders were created in.
+
+    Call after committing the orders' completion: an order completed after
+    its month was frozen would otherwise never appear in it. The month is
+    rewritten from the database on its next export. Returns the number of
+    files removed.
+    """
+    if not order_ids:
+        return 0
+    months = set()
+    for row in db.execute(ORDER_MONTHS_QUERY, {"order_ids": list(order_ids)}):
+        month_start = _to_datetime(row.created_at).date().replace(day=1)
+        if month_is_closed(month_start):
+            months.add((row.hotel_id, month_start))
+    removed = 0
+    for hotel_id, month_start in months:
+        try:
+            os.remove(snapshot_path(hotel_id, "orders", month_start))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+def dataset_batches(db: Session, hotel_id: int, dataset: str, start_date: date, end_date: date) -> Iterator:
+    """Batches for start_date..end_date, in time order.
+
+    Closed months are read from their snapshot, which is written on first
+    use; the current month (and any not yet past the grace period) is
+    queried from the database.
+    """
+    pa = require_pyarrow()
+    import pyarrow.compute as pc
+    time_column = DATASETS[dataset][1]
+    for piece_start, piece_end in month_ranges(start_date, end_date):
+        month_start = piece_start.replace(day=1)
+        if not month_is_closed(month_start):
+            yield from query_batches(db, hotel_id, dataset, piece_start, piece_end)
+            continue
+        path = snapshot_path(hotel_id, dataset, month_start)
+        if not os.path.exists(path):
+            write_month_snapshot(db, hotel_id, dataset, month_start)
+        start, end = day_range(piece_start, piece_end)
+        whole_month = piece_start == month_start and piece_end == month_end(month_start)
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=EXPORT_YIELD_PER):
+            if not whole_month:
+                times = batch.column(time_column)
+                batch = batch.filter(pc.and_(pc.greater_equal(times, pa.scalar(start, times.type)),
+                                             pc.less(times, pa.scalar(end, times.type))))
+            if batch.num_rows:
+                yield batch
+
+def parquet_chunks(hotel_id: int, dataset: str, start_date: date, end_date: date) -> Iterator[bytes]:
+    """Parquet file of the dataset for start_date..end_date, streamed from a temporary file"""
+    with tempfile.TemporaryFile() as output:
+        db = SessionLocal()
+        try:
+            write_parquet(dataset_batches(db, hotel_id, dataset, start_date, end_date), arrow_schema(dataset), output)
+        finally:
+            db.close()
+        output.seek(0)
+        while True:
+            chunk = output.read(FILE_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,53 @@
+from datetime import date, datetime, time, timedelta
+from typing import Tuple
+from sqlalchemy import and_, true
+
+PERIODS = ("day", "week", "month", "year")
+# Lengths in days of the daily trend charts; the first one is the default
+TREND_WINDOWS = (7, 30, 90)
+
+def period_dates(period: str, target_date: date, year_to_date: bool = False) -> Tuple[date, date]:
+    """First and last calendar day (inclusive) of the day/week/month/year containing target_date.
+
+    year_to_date ends a "year" period at target_date instead of Dec 31.
+    Unknown periods fall back to the single day.
+    """
+    if period == "week":
+        start_date = target_date - timedelta(days=target_date.weekday())
+        return start_date, start_date + timedelta(days=6)
+    if period == "month":
+        start_date = target_date.replace(day=1)
+        if start_date.month == 12:
+            next_month = start_date.replace(year=start_date.year + 1, month=1)
+        else:
+            next_month = start_date.replace(month=start_date.month + 1)
+        return start_date, next_month - timedelta(days=1)
+    if period == "year":
+        start_date = target_date.replace(month=1, day=1)
+        return start_date, target_date if year_to_date else target_date.replace(month=12, day=31)
+    return target_date, target_date
+
+def day_range(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+    """Half-open [start, end) timestamp range covering the days start_date..end_date"""
+    return (
+        datetime.combine(start_date, time.min),
+        datetime.combine(end_date + timedelta(days=1), time.min)
+    )
+
+def in_range(column, start: datetime, end: datetime):
+    """Sargable column filter: start <= column < end, so an index on column can be used"""
+    return and_(column >= start, column < end)
+
+def in_days(column, start_date: date, end_date: date):
+    """Filter column to the calendar days start_date..end_date (inclusive)"""
+    return in_range(column, *day_range(start_date, end_date))
+
+def period_filter(column, period: str, target_date: date, year_to_date: bool = False):
+    """Filter column to the period containing target_date.
+
+    Replaces func.date(column) == d and extract('year'/'month', column)
+    comparisons, which wrap the column in a function and defeat its index.
+    """
+    if period not in PERIODS:
+        return true()
+    return in_days(column, *period_dates(period, target_date, year_to_date))
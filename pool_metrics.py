@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Upper bounds (ms) of the connection wait histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def pool_options(database_url: str) -> dict:
+    """create_engine pool keyword arguments from DB_POOL_* environment variables.
+
+    With several uvicorn workers each one gets its own pool, so the worst case
+    is workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections against the
+    database's connection limit.
+    """
+    if ":memory:" in database_url:
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True)
+    }
+
+class PoolMetrics:
+    """Checkout counters and a connection wait-time histogram for one pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe(self, wait: float, timed_out: bool):
+        wait_ms = wait * 1000
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if wait_ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.wait_histogram[bucket] += 1
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            observed = self.checkouts + self.timeouts
+            histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_histogram)}
+            histogram["gt_%dms" % WAIT_BUCKETS_MS[-1]] = self.wait_histogram[-1]
+            return {
+                "pool_size": pool.size() if pool else None,
+                "checked_out": pool.checkedout() if pool else None,
+                "checked_in": pool.checkedin() if pool else None,
+                "overflow": pool.overflow() if pool else None,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / observed * 1000, 3) if observed else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "wait_histogram": histogram
+            }
+
+pool_metrics = {}
+
+def _metrics_for(name: str) -> PoolMetrics:
+    if name not in pool_metrics:
+        pool_metrics[name] = PoolMetrics(name)
+    return pool_metrics[name]
+
+class _TimedCheckoutMixin:
+    # Set per subclass by instrumented_pool_class()
+    metrics: PoolMetrics = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Pool.recreate() (e.g. after dispose) builds a new instance; track the live one
+        self.metrics.pool = self
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - started, timed_out=False)
+        return connection
+
+def instrumented_pool_class(name: str, async_engine: bool = False):
+    """QueuePool (or its asyncio variant) subclass that records checkout wait times under name"""
+    base = AsyncAdaptedQueuePool if async_engine else QueuePool
+    return type(f"Instrumented{base.__name__}", (_TimedCheckoutMixin, base), {"metrics": _metrics_for(name)})
+
+def engine_pool_kwargs(database_url: str, name: str, async_engine: bool = False) -> dict:
+    """pool_options() plus the instrumented pool class, ready to pass to create_engine"""
+    if async_engine and database_url.startswith("sqlite"):
+        # aiosqlite defaults to NullPool for files: connecting is cheap, and a pooled
+        # connection's worker thread would keep the process alive at shutdown
+        return {}
+    options = pool_options(database_url)
+    if options:
+        options["poolclass"] = instrumented_pool_class(name, async_engine)
+    return options
+
+def pool_status() -> dict:
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
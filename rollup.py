@@ -0,0 +1,244 @@
+from sqlalchemy import bindparam, desc, func, text
+from sqlalchemy.orm import Session
+from models import DailyRollup, Staff, COMPLETED_ORDER_STATUS
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+# Quantity and revenue per (order, category) of completed orders, for the given order ids
+ORDER_CATEGORY_TOTALS = text(f"""
+    SELECT o.id AS order_id, o.hotel_id, o.created_at, o.staff_id, COALESCE(o.tip_amount, 0) AS tip_amount,
+           COALESCE(mi.category, 'Food') AS category,
+           SUM(oi.qty) AS quantity, SUM(oi.qty * mi.price) AS revenue
+    FROM tablelink_orders o
+    JOIN tablelink_order_items oi ON oi.order_id = o.id
+    JOIN tablelink_menu_items mi ON mi.id = oi.product_id
+    WHERE o.id IN :order_ids AND o.status = '{COMPLETED_ORDER_STATUS}'
+    GROUP BY o.id, o.hotel_id, o.created_at, o.staff_id, o.tip_amount, COALESCE(mi.category, 'Food')
+    ORDER BY o.id
+""").bindparams(bindparam("order_ids", expanding=True))
+
+# One statement per key, so concurrent checkouts on the same day add up instead of racing an
+# UPDATE-then-INSERT; the conflict target is uq_tablelink_daily_rollups_key
+INCREMENT_ROLLUP = text("""
+    INSERT INTO tablelink_daily_rollups
+    (hotel_id, rollup_date, staff_id, category, quantity, revenue, tips, order_count)
+    VALUES (:hotel_id, :rollup_date, :staff_id, :category, :quantity, :revenue, :tips, :order_count)
+    ON CONFLICT (hotel_id, rollup_date, (COALESCE(staff_id, 0)), (COALESCE(category, ''))) DO UPDATE SET
+        quantity = tablelink_daily_rollups.quantity + EXCLUDED.quantity,
+        revenue = tablelink_daily_rollups.revenue + EXCLUDED.revenue,
+        tips = tablelink_daily_rollups.tips + EXCLUDED.tips,
+        order_count = tablelink_daily_rollups.order_count + EXCLUDED.order_count
+""")
+
+def _increment(db: Session, hotel_id: int, day: date, staff_id: int, category: str,
+               quantity: int, revenue: float, tips: float, order_count: int):
+    db.execute(INCREMENT_ROLLUP, {
+        "hotel_id": hotel_id,
+        "rollup_date": day,
+        "staff_id": staff_id,
+        "category": category,
+        "quantity": quantity,
+        "revenue": revenue,
+        "tips": tips,
+        "order_count": order_count
+    })
+
+def _order_rollup_rows(category_totals: dict, tip_amount: float) -> list:
+    """(category, quantity, revenue, tips, order_count) rows one order adds, the whole-order row (category None) last.
+
+    The tip is split over the categories in proportion to their revenue.
+    """
+    tip_amount = tip_amount or 0.0
+    order_revenue = sum(totals['total_price'] for totals in category_totals.values())
+    order_quantity = sum(totals['quantity'] for totals in category_totals.values())
+
+    rows = []
+    for category, totals in category_totals.items():
+        share = totals['total_price'] / order_revenue if order_revenue else 0
+        rows.append((category, totals['quantity'], totals['total_price'], tip_amount * share, 1))
+    rows.append((None, order_quantity, order_revenue, tip_amount, 1))
+    return rows
+
+def add_order_to_rollup(db: Session, hotel_id: int, day: date, staff_id: int, category_totals: dict, tip_amount: float = 0.0):
+    """Fold one checked-out order into the daily rollup. The caller commits.
+
+    category_totals maps category -> {'quantity': int, 'total_price': float}.
+    """
+    if not category_totals:
+        return
+    for category, quantity, revenue, tips, order_count in _order_rollup_rows(category_totals, tip_amount):
+        _increment(db, hotel_id, day, staff_id, category, quantity, revenue, tips, order_count)
+
+def _order_day(created_at) -> date:
+    # Raw SQLite rows return timestamps as strings
+    return (datetime.fromisoformat(created_at) if isinstance(created_at, str) else created_at).date()
+
+def completed_order_totals(db: Session, order_ids: List[int]) -> Iterable[tuple]:
+    """(hotel_id, day, staff_id, category_totals, tip_amount) per completed order in order_ids.
+
+    The day is the order's created_at day, the same day the exports and
+    analytics_engine file the order under.
+    """
+    orders = {}
+    for row in db.execute(ORDER_CATEGORY_TOTALS, {"order_ids": list(order_ids)}):
+        order = orders.get(row.order_id)
+        if order is None:
+            order = orders[row.order_id] = (row.hotel_id, _order_day(row.created_at), row.staff_id, {}, float(row.tip_amount))
+        order[3][row.category] = {'quantity': int(row.quantity or 0), 'total_price': float(row.revenue or 0)}
+    return orders.values()
+
+def add_orders_to_rollup(db: Session, order_ids: List[int]):
+    """Fold orders that have just been marked completed into the rollup.
+
+    Call it in the transaction that completes them, with only the ids whose
+    status actually changed (UPDATE ... RETURNING), so each order is counted
+    once. The caller commits.
+    """
+    if not order_ids:
+        return
+    for hotel_id, day, staff_id, category_totals, tip_amount in completed_order_totals(db, order_ids):
+        add_order_to_rollup(db, hotel_id, day, staff_id, category_totals, tip_amount)
+
+def rebuild_daily_rollup(db: Session, hotel_id: int = None, batch_size: int = 5000) -> int:
+    """Recompute the rollup from completed orders, reading orders in id-ordered batches"""
+    delete_query = db.query(DailyRollup)
+    if hotel_id is not None:
+        delete_query = delete_query.filter(DailyRollup.hotel_id == hotel_id)
+    delete_query.delete(synchronize_session=False)
+
+    hotel_filter = "AND hotel_id = :hotel_id" if hotel_id is not None else ""
+    buckets = {}
+    last_id = 0
+    orders_read = 0
+    while True:
+        order_ids = db.execute(text(f"""
+            SELECT id FROM tablelink_orders
+            WHERE status = '{COMPLETED_ORDER_STATUS}' AND id > :last_id {hotel_filter}
+            ORDER BY id LIMIT :batch_size
+        """), {"last_id": last_id, "hotel_id": hotel_id, "batch_size": batch_size}).scalars().all()
+        if not order_ids:
+            break
+
+        for order_hotel_id, day, staff_id, category_totals, tip_amount in completed_order_totals(db, order_ids):
+            for category, quantity, revenue, tips, order_count in _order_rollup_rows(category_totals, tip_amount):
+                bucket = buckets.setdefault((order_hotel_id, day, staff_id, category), [0, 0.0, 0.0, 0])
+                bucket[0] += quantity
+                bucket[1] += revenue
+                bucket[2] += tips
+                bucket[3] += order_count
+
+        last_id = order_ids[-1]
+        orders_read += len(order_ids)
+        print(f"Rollup backfill: read {orders_read} completed orders")
+
+    rows = [
+        {
+            "hotel_id": key[0],
+            "rollup_date": key[1],
+            "staff_id": key[2],
+            "category": key[3],
+            "quantity": bucket[0],
+            "revenue": bucket[1],
+            "tips": bucket[2],
+            "order_count": bucket[3]
+        }
+        for key, bucket in buckets.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.bulk_insert_mappings(DailyRollup, rows[start:start + batch_size])
+
+    db.commit()
+    return len(rows)
+
+def _rollup_query(db: Session, hotel_id: int, start_date: date, end_date: date, staff_id: Optional[int], *columns):
+    query = db.query(*columns).filter(
+        DailyRollup.hotel_id == hotel_id,
+        DailyRollup.rollup_date >= start_date,
+        DailyRollup.rollup_date <= end_date
+    )
+    if staff_id:
+        query = query.filter(DailyRollup.staff_id == staff_id)
+    return query
+
+def rollup_summary(db: Session, hotel_id: int, start_date: date, end_date: date, staff_id: int = None) -> dict:
+    """Summary, category and staff totals for the days start_date..end_date, read from the rollup.
+
+    Reads at most one row per day, staff member and category, however many
+    orders the period holds. Same keys and item shapes as
+    analytics_engine.period_analytics().
+    """
+    totals = _rollup_query(
+        db, hotel_id, start_date, end_date, staff_id,
+        func.sum(DailyRollup.order_count).label('orders'),
+        func.sum(DailyRollup.revenue).label('revenue'),
+        func.sum(DailyRollup.tips).label('tips')
+    ).filter(DailyRollup.category.is_(None)).one()
+
+    categories = _rollup_query(
+        db, hotel_id, start_date, end_date, staff_id,
+        DailyRollup.category.label('category'),
+        func.sum(DailyRollup.quantity).label('quantity_sold'),
+        func.sum(DailyRollup.revenue).label('revenue')
+    ).filter(DailyRollup.category.isnot(None)).group_by(DailyRollup.category).order_by(
+        desc(func.sum(DailyRollup.revenue))
+    ).all()
+
+    # Whole-order rows count each order once per staff member
+    staff = _rollup_query(
+        db, hotel_id, start_date, end_date, staff_id,
+        Staff.name.label('name'),
+        func.sum(DailyRollup.order_count).label('total_orders'),
+        func.sum(DailyRollup.revenue).label('total_sales'),
+        func.sum(DailyRollup.tips).label('total_tips'),
+        func.sum(DailyRollup.quantity).label('total_items')
+    ).join(Staff, Staff.id == DailyRollup.staff_id).filter(DailyRollup.category.is_(None)).group_by(
+        Staff.id, Staff.name
+    ).order_by(desc(func.sum(DailyRollup.revenue))).all()
+
+    return {
+        "summary": {
+            "total_orders": int(totals.orders or 0),
+            "total_sales": float(totals.revenue or 0),
+            "total_tips": float(totals.tips or 0)
+        },
+        "categories": [
+            {"category": row.category, "quantity_sold": int(row.quantity_sold or 0), "revenue": float(row.revenue or 0)}
+            for row in categories
+        ],
+        "waiters": [
+            {
+                "name": row.name,
+                "total_orders": int(row.total_orders or 0),
+                "total_sales": float(row.total_sales or 0),
+                "total_tips": float(row.total_tips or 0),
+                "total_items": int(row.total_items or 0),
+                "avg_order_value": float(row.total_sales or 0) / max(int(row.total_orders or 0), 1)
+            }
+            for row in staff
+        ]
+    }
+
+def rollup_daily_trend(db: Session, hotel_id: int, end_date: date, days: int, staff_id: int = None) -> list:
+    """Orders and revenue per day for the days days ending at end_date, days without orders as zeros.
+
+    One GROUP BY over the window, so a 90-day chart costs a single query.
+    """
+    start_date = end_date - timedelta(days=days - 1)
+    rows = _rollup_query(
+        db, hotel_id, start_date, end_date, staff_id,
+        DailyRollup.rollup_date.label('day'),
+        func.sum(DailyRollup.order_count).label('orders'),
+        func.sum(DailyRollup.revenue).label('revenue')
+    ).filter(DailyRollup.category.is_(None)).group_by(DailyRollup.rollup_date).all()
+    by_day = {row.day: row for row in rows}
+
+    trend = []
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        row = by_day.get(day)
+        trend.append({
+            "date": day.isoformat(),
+            "orders": int(row.orders or 0) if row else 0,
+            "revenue": float(row.revenue or 0) if row else 0.0
+        })
+    return trend
@@ -0,0 +1,86 @@
+import os
+from typing import Iterable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Rows per INSERT statement. Each row binds two parameters (room_number, code), the
+# room type details are bound once per statement, so the default stays well under
+# SQLite's historic 999 bound-parameter limit.
+ROOM_INSERT_CHUNK = int(os.getenv("ROOM_INSERT_CHUNK", "400"))
+
+DEFAULT_AMENITIES = "WiFi, AC, TV, Room Service"
+
+def bump_hotel_rooms_version(db: Session, hotel_id: int) -> int:
+    """Advance the hotel's rooms_version and return it, so new rooms can be stamped with it"""
+    return db.execute(text("""
+        UPDATE tablelink_hotels SET rooms_version = COALESCE(rooms_version, 0) + 1
+        WHERE id = :hotel_id
+        RETURNING rooms_version
+    """), {"hotel_id": hotel_id}).scalar()
+
+def existing_room_numbers(db: Session, hotel_id: int, room_numbers: Iterable[int]) -> set:
+    """Room numbers of the hotel that already exist, among room_numbers, in one query"""
+    wanted = set(room_numbers)
+    if not wanted:
+        return set()
+    low, high = min(wanted), max(wanted)
+    rows = db.execute(text("""
+        SELECT room_number FROM tablelink_rooms
+        WHERE hotel_id = :hotel_id AND room_number BETWEEN :low AND :high
+    """), {"hotel_id": hotel_id, "low": low, "high": high}).scalars().all()
+    return wanted.intersection(rows)
+
+def provision_rooms(db: Session, hotel_id: int, room_numbers: Iterable[int], details: dict,
+                    version: int, update_existing: bool = False) -> dict:
+    """Create the hotel's rooms room_numbers, all sharing the room type details.
+
+    details holds room_type, price_per_night, max_guests, description and
+    optionally amenities and image_url. Rooms that already exist are updated
+    with the details when update_existing is set, otherwise left alone. One
+    query finds the existing rooms, then multi-row INSERT ... ON CONFLICT
+    statements (relying on the unique (hotel_id, room_number) index) write
+    the rest; the conflict clause also covers rooms created concurrently.
+    Does not commit.
+    """
+    room_numbers = sorted(set(room_numbers))
+    existing = existing_room_numbers(db, hotel_id, room_numbers)
+    to_write = room_numbers if update_existing else [n for n in room_numbers if n not in existing]
+
+    if update_existing:
+        on_conflict = """DO UPDATE SET room_type = EXCLUDED.room_type, price_per_night = EXCLUDED.price_per_night,
+                         max_guests = EXCLUDED.max_guests, description = EXCLUDED.description,
+                         amenities = EXCLUDED.amenities"""
+    else:
+        on_conflict = "DO NOTHING"
+
+    params = {
+        "hotel_id": hotel_id,
+        "room_type": details["room_type"],
+        "price_per_night": details["price_per_night"],
+        "max_guests": details["max_guests"],
+        "description": details.get("description", ""),
+        "amenities": details.get("amenities", DEFAULT_AMENITIES),
+        "image_url": details.get("image_url"),
+        "version": version
+    }
+    for start in range(0, len(to_write), ROOM_INSERT_CHUNK):
+        chunk = to_write[start:start + ROOM_INSERT_CHUNK]
+        values = []
+        chunk_params = dict(params)
+        for i, room_number in enumerate(chunk):
+            values.append(f"(:hotel_id, :n{i}, :room_type, :price_per_night, :max_guests, "
+                          f":description, :c{i}, :amenities, 'available', :image_url, :version)")
+            chunk_params[f"n{i}"] = room_number
+            chunk_params[f"c{i}"] = f"R{room_number}"
+        db.execute(text(f"""
+            INSERT INTO tablelink_rooms
+            (hotel_id, room_number, room_type, price_per_night, max_guests,
+             description, code, amenities, status, image_url, version)
+            VALUES {", ".join(values)}
+            ON CONFLICT (hotel_id, room_number) {on_conflict}
+        """), chunk_params)
+
+    created = len(room_numbers) - len(existing)
+    if update_existing:
+        return {"created": created, "updated": len(existing)}
+    return {"created": created, "skipped": len(existing)}
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+import sys
+from datetime import date
+from sqlalchemy import text
+from models import SessionLocal
+from parquet_export import DATASETS, month_ranges, month_is_closed, write_month_snapshot
+
+def snapshot_analytics(hotel_id: int = None, overwrite: bool = False):
+    db = SessionLocal()
+    
+    try:
+        if hotel_id is not None:
+            hotel_ids = [hotel_id]
+        else:
+            hotel_ids = db.execute(text("SELECT id FROM tablelink_hotels ORDER BY id")).scalars().all()
+        
+        written = 0
+        for current_hotel_id in hotel_ids:
+            first = db.execute(text("""
+                SELECT MIN(first_day) FROM (
+                    SELECT MIN(checkout_date) AS first_day FROM tablelink_analytics_records WHERE hotel_id = :hotel_id
+                    UNION ALL
+                    SELECT MIN(created_at) FROM tablelink_orders WHERE hotel_id = :hotel_id
+                ) AS firsts
+            """), {"hotel_id": current_hotel_id}).scalar()
+            if first is None:
+                continue
+            first_day = date.fromisoformat(str(first)[:10])
+            
+            for month_start, _ in month_ranges(first_day.replace(day=1), date.today()):
+                if not month_is_closed(month_start):
+                    break
+                for dataset in DATASETS:
+                    path = write_month_snapshot(db, current_hotel_id, dataset, month_start, overwrite)
+                    if path:
+                        written += 1
+                        print(f"✅ Wrote {path}")
+        
+        print(f"\n🎉 Analytics snapshots completed: {written} files written")
+        
+    except Exception as e:
+        print(f"❌ Snapshot error: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # Usage: python snapshot_analytics.py [hotel_id] [--overwrite]
+    args = [arg for arg in sys.argv[1:] if arg != "--overwrite"]
+    snapshot_analytics(int(args[0]) if args else None, "--overwrite" in sys.argv)
@@ -38,8 +38,13 @@ document.addEventListener('DOMContentLoaded', function() {
     // Load waiters for modal
     loadWaitersForModal();
     
-    // Auto-refresh dashboard every 3 seconds
-    setInterval(loadDashboard, 3000);
+    // Refresh the dashboard when the server pushes a change; poll every 3 seconds only while the stream is down
+    connectDashboardEvents();
+    setInterval(() => {
+        if (!dashboardEventsConnected) {
+            loadDashboard();
+        }
+    }, 3000);
     
     // Check trial status every 30 seconds
     setInterval(checkTrialStatus, 30000);
@@ -103,6 +108,20 @@ function logout() {
     }
 }
 
+let dashboardEventsConnected = false;
+
+function connectDashboardEvents() {
+    if (!window.EventSource) {
+        return;
+    }
+    const source = new EventSource('/business/events');
+    source.onopen = () => { dashboardEventsConnected = true; };
+    source.onerror = () => { dashboardEventsConnected = false; };
+    ['room_status', 'order_created', 'order_completed', 'booking_status'].forEach(eventName => {
+        source.addEventListener(eventName, () => loadDashboard());
+    });
+}
+
 async function loadDashboard() {
     try {
         const url = '/business/tables';
@@ -430,9 +449,10 @@ async function uploadMenu(event) {
         const data = await response.json();
         
         if (response.ok) {
-            showMessage('Menu uploaded successfully', 'success');
+            // The upload is only queued (202); the menu changes once the import job is done
+            showMessage('Menu uploaded, importing...', 'success');
             fileInput.value = '';
-            loadMenuItems();
+            pollMenuJob(data.job_id);
         } else {
             showMessage(data.detail || 'Error uploading menu', 'error');
         }
@@ -441,6 +461,27 @@ async function uploadMenu(event) {
     }
 }
 
+async function pollMenuJob(jobId) {
+    try {
+        const response = await fetch(`/business/menu/jobs/${jobId}`);
+        const job = await response.json();
+
+        if (!response.ok) {
+            showMessage(job.detail || 'Error checking menu import', 'error');
+        } else if (job.status === 'done') {
+            const rejected = job.errors.length ? `, ${job.errors.length} rows rejected` : '';
+            showMessage(`Menu imported: ${job.items_added} items${rejected}`, 'success');
+            loadMenuItems();
+        } else if (job.status === 'failed') {
+            showMessage(`Menu import failed: ${job.error}`, 'error');
+        } else {
+            setTimeout(() => pollMenuJob(jobId), 1000);
+        }
+    } catch (error) {
+        setTimeout(() => pollMenuJob(jobId), 3000);
+    }
+}
+
 let currentPeriod = 'day';
 let currentDate = new Date().toISOString().split('T')[0];
 let currentWaiterId = null;
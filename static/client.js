@@ -2,6 +2,32 @@ let menu = [];
 let order = [];
 let roomNumber = null;
 let roomCode = '';
+let orderKey = null;  // Idempotency-Key for the current cart; reused by retries and double taps
+
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    // randomUUID needs a secure context; plain-http hotel portals fall back to this
+    return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2) + Math.random().toString(36).slice(2);
+}
+
+async function postOrder(formData, retries = 1) {
+    try {
+        return await fetch('/client/order', {
+            method: 'POST',
+            headers: { 'Idempotency-Key': orderKey },
+            body: formData
+        });
+    } catch (error) {
+        // Network drop: resend with the same key, the server will not create a second order
+        if (retries > 0) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            return postOrder(formData, retries - 1);
+        }
+        throw error;
+    }
+}
 
 document.addEventListener('DOMContentLoaded', function() {
     const urlParams = new URLSearchParams(window.location.search);
@@ -94,6 +120,8 @@ function updateQuantity(itemId, change) {
 }
 
 function updateOrderDisplay() {
+    // The cart changed, so the next submission is a new order
+    orderKey = null;
     const orderItemsContainer = document.getElementById('order-items');
     const totalElement = document.getElementById('total');
     const placeOrderBtn = document.getElementById('place-order-btn');
@@ -141,16 +169,17 @@ async function placeOrder(event) {
         return;
     }
     
+    if (!orderKey) {
+        orderKey = newIdempotencyKey();
+    }
+    
     try {
         const formData = new FormData();
         formData.append('room_number', roomNumber);
         formData.append('code', code);
         formData.append('items', JSON.stringify(order));
         
-        const response = await fetch('/client/order', {
-            method: 'POST',
-            body: formData
-        });
+        const response = await postOrder(formData);
         
         const data = await response.json();
         
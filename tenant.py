@@ -1,32 +1,67 @@
 from fastapi import HTTPException, Request
 from sqlalchemy.orm import Session
-from models import Restaurant
-from typing import Optional
+from models import Hotel
+from cache import TTLCache
+from contextvars import ContextVar, Token
+from datetime import datetime
+from typing import NamedTuple, Optional
+import os
 
-class TenantContext:
-    def __init__(self):
-        self.restaurant_id: Optional[int] = None
-        self.restaurant: Optional[Restaurant] = None
+class TenantRecord(NamedTuple):
+    """Detached, immutable snapshot of the tenant columns needed per request"""
+    id: int
+    subdomain: str
+    name: str
+    plan_type: Optional[str]
+    active: bool
+    trial_ends_at: Optional[datetime]
 
-# Thread-local tenant context
-import threading
-tenant_context = threading.local()
+# Per-request tenant context. A ContextVar (unlike threading.local) is isolated
+# between concurrent requests running on the same event loop thread.
+_current_tenant: ContextVar[Optional[TenantRecord]] = ContextVar("current_tenant", default=None)
 
-def get_restaurant_from_subdomain(subdomain: str, db: Session) -> Optional[Restaurant]:
-    """Get restaurant by subdomain"""
-    return db.query(Restaurant).filter(
-        Restaurant.subdomain == subdomain,
-        Restaurant.active == True
-    ).first()
+# Subdomain -> TenantRecord. Entries are dropped explicitly via invalidate_tenant()
+# whenever a hotel row changes; the TTL only bounds staleness across workers.
+tenant_cache = TTLCache(
+    max_entries=int(os.getenv("TENANT_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("TENANT_CACHE_TTL", "60"))
+)
 
-def get_restaurant_from_request(request: Request, db: Session, original_path: str = None) -> Restaurant:
-    """Extract restaurant from request (subdomain or path parameter)"""
-    
-    # Use original path if provided, otherwise use current path
-    path = original_path or str(request.url.path)
+def _load_tenant(subdomain: str, db: Session) -> Optional[TenantRecord]:
+    hotel = db.query(
+        Hotel.id, Hotel.subdomain, Hotel.name, Hotel.plan_type, Hotel.active, Hotel.trial_ends_at
+    ).filter(Hotel.subdomain == subdomain).first()
+    if not hotel:
+        return None
+    return TenantRecord(
+        id=hotel.id,
+        subdomain=hotel.subdomain,
+        name=hotel.name,
+        plan_type=hotel.plan_type,
+        active=bool(hotel.active),
+        trial_ends_at=hotel.trial_ends_at
+    )
+
+def get_restaurant_from_subdomain(subdomain: str, db: Session) -> Optional[TenantRecord]:
+    """Get active restaurant by subdomain, served from the tenant cache when possible"""
+    record = tenant_cache.get_or_load(subdomain, lambda: _load_tenant(subdomain, db))
+    if record is None or not record.active:
+        return None
+    return record
+
+def invalidate_tenant(subdomain: str = None, hotel_id: int = None):
+    """Drop cached tenant records after a hotel row changes (plan, active flag, name...)"""
+    if subdomain is not None:
+        tenant_cache.pop(subdomain)
+    if hotel_id is not None:
+        tenant_cache.discard_where(lambda key, record: record.id == hotel_id)
+    if subdomain is None and hotel_id is None:
+        tenant_cache.clear()
+
+def resolve_tenant(host: str, path: str, referer: str, db: Session) -> TenantRecord:
+    """Resolve the tenant from raw host/path/referer values (no Request object needed)"""
     
     # Method 1: Extract from subdomain (for production)
-    host = request.headers.get("host", "")
     if "." in host and not host.startswith("localhost"):
         subdomain = host.split(".")[0]
         restaurant = get_restaurant_from_subdomain(subdomain, db)
@@ -34,64 +69,55 @@ def get_restaurant_from_request(request: Request, db: Session, original_path: st
             return restaurant
     
     # Method 2: Extract from path parameter (for development)
-    print(f"Tenant resolution: path={path}")
     if path.startswith("/r/"):
         parts = path.split("/")
         if len(parts) >= 3:
-            subdomain = parts[2]
-            print(f"Tenant resolution: extracted subdomain='{subdomain}'")
-            restaurant = get_restaurant_from_subdomain(subdomain, db)
+            restaurant = get_restaurant_from_subdomain(parts[2], db)
             if restaurant:
-                print(f"Tenant resolution: found restaurant {restaurant.id} ({restaurant.name})")
                 return restaurant
-            else:
-                print(f"Tenant resolution: no restaurant found for subdomain '{subdomain}'")
     
     # Method 2b: Check referer header for AJAX requests
-    referer = request.headers.get('referer', '')
-    print(f"Tenant resolution: checking referer={referer}")
     if '/r/' in referer:
         try:
             subdomain = referer.split('/r/')[1].split('/')[0]
-            print(f"Tenant resolution: extracted subdomain from referer='{subdomain}'")
             restaurant = get_restaurant_from_subdomain(subdomain, db)
             if restaurant:
-                print(f"Tenant resolution: found restaurant from referer {restaurant.id} ({restaurant.name})")
                 return restaurant
         except Exception as e:
             print(f"Tenant resolution: error parsing referer: {e}")
     
     # Method 3: Default to demo restaurant for localhost only if no subdomain specified
     if ("localhost" in host or "127.0.0.1" in host) and not ('/r/' in path or '/r/' in referer):
-        print(f"Tenant resolution: defaulting to demo restaurant")
-        restaurant = db.query(Restaurant).filter(
-            Restaurant.subdomain == 'demo',
-            Restaurant.active == True
-        ).first()
+        restaurant = get_restaurant_from_subdomain('demo', db)
         if restaurant:
             return restaurant
     
     raise HTTPException(status_code=404, detail="Restaurant not found or inactive")
 
-def set_tenant_context(restaurant: Restaurant):
-    """Set the current tenant context"""
-    if not hasattr(tenant_context, 'restaurant_id'):
-        tenant_context.restaurant_id = None
-        tenant_context.restaurant = None
-    tenant_context.restaurant_id = restaurant.id
-    tenant_context.restaurant = restaurant
+def get_restaurant_from_request(request: Request, db: Session, original_path: str = None) -> TenantRecord:
+    """Extract restaurant from request (subdomain or path parameter)"""
+    # Use original path if provided, otherwise use current path
+    path = original_path or str(request.url.path)
+    return resolve_tenant(request.headers.get("host", ""), path, request.headers.get("referer", ""), db)
+
+def set_tenant_context(restaurant: TenantRecord) -> Token:
+    """Set the current tenant context; returns a token for reset_tenant_context()"""
+    return _current_tenant.set(restaurant)
+
+def reset_tenant_context(token: Token):
+    """Restore the tenant context that was active before set_tenant_context()"""
+    _current_tenant.reset(token)
 
 def get_current_restaurant_id() -> int:
     """Get current restaurant ID from context"""
-    if not hasattr(tenant_context, 'restaurant_id') or not tenant_context.restaurant_id:
-        raise HTTPException(status_code=400, detail="No restaurant context")
-    return tenant_context.restaurant_id
+    return get_current_restaurant().id
 
-def get_current_restaurant() -> Restaurant:
+def get_current_restaurant() -> TenantRecord:
     """Get current restaurant from context"""
-    if not hasattr(tenant_context, 'restaurant') or not tenant_context.restaurant:
+    restaurant = _current_tenant.get()
+    if not restaurant:
         raise HTTPException(status_code=400, detail="No restaurant context")
-    return tenant_context.restaurant
+    return restaurant
 
 def requires_plan(required_plan: str):
     """Decorator to check if restaurant has required plan"""
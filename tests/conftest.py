@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+
+# models.py reads DATABASE_URL at import time: point it at a throwaway SQLite file
+# before anything imports it, so the suite never touches database.db
+_DB_DIR = tempfile.mkdtemp(prefix="tablelink-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import text
+import models
+from availability import invalidate_availability
+from menu_cache import invalidate_menu
+from tenant import invalidate_tenant
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    """Empty schema and cold in-process caches for every test"""
+    models.Base.metadata.drop_all(bind=models.engine)
+    models.create_tables()
+    invalidate_availability()
+    invalidate_menu()
+    invalidate_tenant()
+    yield
+
+@pytest.fixture
+def db():
+    session = models.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def make_hotel(db):
+    """make_hotel(subdomain, rooms=..., room_type=...) -> hotel id, with rooms and a small menu"""
+    def make(subdomain="seaview", rooms=(101, 102, 103), room_type="Double"):
+        hotel_id = db.execute(text("""
+            INSERT INTO tablelink_hotels (name, subdomain, active, rooms_version)
+            VALUES (:name, :subdomain, true, 0)
+            RETURNING id
+        """), {"name": subdomain.title(), "subdomain": subdomain}).scalar_one()
+        if rooms:
+            db.execute(text("""
+                INSERT INTO tablelink_rooms (hotel_id, room_number, code, status, room_type, price_per_night, version)
+                VALUES (:hotel_id, :room_number, :code, 'available', :room_type, 100.0, 0)
+            """), [
+                {"hotel_id": hotel_id, "room_number": number, "code": f"C{number % 100:02d}", "room_type": room_type}
+                for number in rooms
+            ])
+        db.execute(text("""
+            INSERT INTO tablelink_menu_items (hotel_id, name, ingredients, price, category, active)
+            VALUES (:hotel_id, :name, :name, :price, :category, true)
+        """), [
+            {"hotel_id": hotel_id, "name": "Eggs", "price": 12.0, "category": "Breakfast"},
+            {"hotel_id": hotel_id, "name": "Tea", "price": 3.0, "category": "Drinks"}
+        ])
+        db.commit()
+        return hotel_id
+    return make
+
+@pytest.fixture
+def make_order(db):
+    """make_order(hotel_id, room_number, items={name: qty}, status=..., created_at=...) -> order id"""
+    def make(hotel_id, room_number, items=None, status="active", created_at=None, staff_id=None, tip_amount=0.0):
+        from datetime import datetime
+        room_id = db.execute(text("""
+            SELECT id FROM tablelink_rooms WHERE hotel_id = :hotel_id AND room_number = :room_number
+        """), {"hotel_id": hotel_id, "room_number": room_number}).scalar_one()
+        order_id = db.execute(text("""
+            INSERT INTO tablelink_orders (hotel_id, room_id, staff_id, created_at, status, tip_amount)
+            VALUES (:hotel_id, :room_id, :staff_id, :created_at, :status, :tip_amount)
+            RETURNING id
+        """), {"hotel_id": hotel_id, "room_id": room_id, "staff_id": staff_id, "status": status,
+               "created_at": created_at or datetime.utcnow(), "tip_amount": tip_amount}).scalar_one()
+        products = dict(db.execute(text("SELECT name, id FROM tablelink_menu_items WHERE hotel_id = :hotel_id"),
+                                   {"hotel_id": hotel_id}).fetchall())
+        db.execute(text("""
+            INSERT INTO tablelink_order_items (order_id, product_id, qty) VALUES (:order_id, :product_id, :qty)
+        """), [
+            {"order_id": order_id, "product_id": products[name], "qty": qty}
+            for name, qty in (items or {"Eggs": 2, "Tea": 1}).items()
+        ])
+        db.commit()
+        return order_id
+    return make
@@ -0,0 +1,48 @@
+"""The analytics dashboard reads totals and trends from the daily rollup kept current at completion"""
+from datetime import date, datetime
+import analytics_engine
+
+def test_dashboard_counts_orders_completed_through_the_api(client, make_hotel, make_order):
+    hotel_id = make_hotel()
+    completed_at = datetime(2025, 7, 10, 12, 0)
+    for room_number, items, tip in ((101, {"Eggs": 2, "Tea": 1}, 2.0), (102, {"Tea": 3}, 0.0)):
+        order_id = make_order(hotel_id, room_number, items=items, created_at=completed_at, tip_amount=tip)
+        assert client.post(f"/business/complete-order/{order_id}").status_code == 200
+    # Still active: not on the dashboard
+    make_order(hotel_id, 103, items={"Eggs": 5}, created_at=completed_at)
+
+    response = client.get("/business/analytics/dashboard", params={
+        "period": "day", "target_date": "2025-07-10", "trend_days": 7, "hotel_subdomain": "seaview"
+    })
+    assert response.status_code == 200
+    dashboard = response.json()
+    assert dashboard["summary"] == {"total_orders": 2, "total_sales": 36.0, "total_tips": 2.0}
+    assert [(c["category"], c["quantity_sold"], c["revenue"]) for c in dashboard["categories"]] == [
+        ("Breakfast", 2, 24.0), ("Drinks", 4, 12.0)
+    ]
+    assert [(item["name"], item["quantity_sold"]) for item in dashboard["top_items"]] == [("Tea", 4), ("Eggs", 2)]
+    assert len(dashboard["trends"]) == 7
+    assert dashboard["trends"][-1] == {"date": "2025-07-10", "orders": 2, "revenue": 36.0}
+    assert all(day["orders"] == 0 for day in dashboard["trends"][:-1])
+
+def test_item_trends_only_count_the_item(db, make_hotel, make_order):
+    hotel_id = make_hotel()
+    for day in (8, 10):
+        make_order(hotel_id, 101, items={"Eggs": 2, "Tea": day - 7}, status="completed",
+                   created_at=datetime(2025, 7, day, 9, 0))
+
+    trends = analytics_engine.item_performance_trends(db, hotel_id, "Tea", days=3,
+                                                      end_date=date(2025, 7, 10))
+    assert trends["summary"]["total_quantity"] == 4
+    assert trends["summary"]["active_days"] == 2
+    assert [day["quantity"] for day in trends["daily_trends"]] == [1, 0, 3]
+
+def test_analytics_routes_reject_out_of_range_limits(client, make_hotel):
+    make_hotel()
+    params = {"hotel_subdomain": "seaview"}
+    assert client.get("/business/analytics/top-items", params={**params, "limit": 0}).status_code == 422
+    assert client.get("/business/analytics/top-items", params={**params, "limit": 101}).status_code == 422
+    assert client.get("/business/analytics/top-items", params={**params, "limit": 5}).status_code == 200
+    assert client.get("/business/analytics/item-trends/Tea", params={**params, "days": 0}).status_code == 422
+    assert client.get("/business/analytics/item-trends/Tea", params={**params, "days": 367}).status_code == 422
+    assert client.get("/business/analytics/item-trends/Tea", params={**params, "days": 7}).status_code == 200
@@ -0,0 +1,96 @@
+"""Concurrent public bookings for the last few rooms: allocation must never overbook"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+import main
+import models
+from availability import allocate_room
+
+GUESTS = 300
+CLIENT_THREADS = 16
+
+def test_concurrent_bookings_never_overbook(db, make_hotel, monkeypatch, record_property):
+    make_hotel(rooms=(101, 102, 103, 104, 105), room_type="Suite")
+    # Never update the in-memory availability index after a booking, as if every
+    # booking had been made by another worker: only the database re-check stops overbooking
+    monkeypatch.setattr(main, "record_booking", lambda *args: None)
+
+    def book(guest: int) -> int:
+        # No `with`: each request gets its own event loop, so requests really overlap
+        client = TestClient(main.app)
+        return client.post("/api/public/book-room", json={
+            "hotel_subdomain": "seaview",
+            "room_type": "Suite",
+            "check_in_date": "2025-07-10",
+            "check_out_date": "2025-07-13",
+            "guest_name": f"Guest {guest}",
+            "guest_email": f"guest{guest}@example.com"
+        }).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CLIENT_THREADS) as pool:
+        statuses = list(pool.map(book, range(GUESTS)))
+    elapsed = time.perf_counter() - started
+
+    bookings = db.execute(text("""
+        SELECT room_id, check_in_date, check_out_date FROM tablelink_room_bookings
+    """)).fetchall()
+    booked_rooms = [booking.room_id for booking in bookings]
+    assert statuses.count(200) == 5
+    assert statuses.count(400) == GUESTS - 5
+    assert len(bookings) == 5
+    assert len(set(booked_rooms)) == 5
+
+    throughput = GUESTS / elapsed
+    record_property("booking_requests_per_second", round(throughput, 1))
+    print(f"{GUESTS} concurrent booking requests in {elapsed:.2f}s ({throughput:.0f} req/s)")
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"),
+                    reason="set TEST_POSTGRES_URL to a scratch PostgreSQL database")
+def test_postgres_concurrent_bookers_take_different_free_rooms():
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    Session = sessionmaker(bind=engine)
+    try:
+        models.Base.metadata.drop_all(bind=engine)
+        models.Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            hotel_id = conn.execute(text("""
+                INSERT INTO tablelink_hotels (name, subdomain, active, rooms_version)
+                VALUES ('Seaview', 'seaview', true, 0) RETURNING id
+            """)).scalar_one()
+            conn.execute(text("""
+                INSERT INTO tablelink_rooms (hotel_id, room_number, code, status, room_type, price_per_night, version)
+                VALUES (:hotel_id, :room_number, :code, 'available', 'Suite', 100.0, 0)
+            """), [{"hotel_id": hotel_id, "room_number": 101, "code": "C01"},
+                   {"hotel_id": hotel_id, "room_number": 102, "code": "C02"}])
+        check_in, check_out = datetime(2025, 7, 10), datetime(2025, 7, 13)
+
+        first, second = Session(), Session()
+        try:
+            # The first booker still holds its room lock while the second one allocates
+            first_room = allocate_room(first, hotel_id, "Suite", check_in, check_out)
+            second_room = allocate_room(second, hotel_id, "Suite", check_in, check_out)
+            assert first_room is not None and second_room is not None
+            assert first_room != second_room
+            for session, room_id in ((first, first_room), (second, second_room)):
+                session.execute(text("""
+                    INSERT INTO tablelink_room_bookings
+                    (hotel_id, room_id, guest_name, guest_email, check_in_date, check_out_date,
+                     total_nights, total_price, status)
+                    VALUES (:hotel_id, :room_id, 'Guest', 'guest@example.com', :check_in, :check_out, 3, 300.0, 'pending')
+                """), {"hotel_id": hotel_id, "room_id": room_id, "check_in": check_in, "check_out": check_out})
+                session.commit()
+        finally:
+            first.close()
+            second.close()
+
+        with Session() as third:
+            assert allocate_room(third, hotel_id, "Suite", check_in, check_out) is None
+    finally:
+        models.Base.metadata.drop_all(bind=engine)
+        engine.dispose()
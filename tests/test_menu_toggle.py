@@ -0,0 +1,29 @@
+"""Toggling a menu item drops the hotel's cached guest menu"""
+import json
+from sqlalchemy import text
+from menu_cache import get_menu_payload
+
+def menu_names(db, hotel_id: int) -> set:
+    menu = json.loads(get_menu_payload(db, hotel_id).body)
+    return {item["name"] for items in menu.values() for item in items}
+
+def test_toggled_item_leaves_and_rejoins_the_cached_menu(client, db, make_hotel):
+    hotel_id = make_hotel()
+    tea_id = db.execute(text("SELECT id FROM tablelink_menu_items WHERE name = 'Tea'")).scalar_one()
+    assert menu_names(db, hotel_id) == {"Eggs", "Tea"}
+
+    response = client.post(f"/business/toggle_product/{tea_id}", params={"hotel_subdomain": "seaview"})
+    assert response.json()["active"] is False
+    assert menu_names(db, hotel_id) == {"Eggs"}
+
+    response = client.post(f"/business/toggle_product/{tea_id}", params={"hotel_subdomain": "seaview"})
+    assert response.json()["active"] is True
+    assert menu_names(db, hotel_id) == {"Eggs", "Tea"}
+
+def test_items_of_another_hotel_are_not_found(client, db, make_hotel):
+    make_hotel()
+    make_hotel("lakeside", rooms=(201,))
+    tea_id = db.execute(text("SELECT mi.id FROM tablelink_menu_items mi JOIN tablelink_hotels h ON h.id = mi.hotel_id "
+                             "WHERE h.subdomain = 'seaview' AND mi.name = 'Tea'")).scalar_one()
+    response = client.post(f"/business/toggle_product/{tea_id}", params={"hotel_subdomain": "lakeside"})
+    assert response.status_code == 404
@@ -0,0 +1,51 @@
+"""Query-count regression tests for the dashboard order listings (no per-order item lookups)"""
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+import models
+
+@contextmanager
+def count_queries():
+    """Statements sent to the database (sync and async engines) inside the block"""
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    engines = (models.engine, models.async_engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.mark.parametrize("url", ["/business/orders?hotel_subdomain=seaview", "/business/orders"])
+def test_orders_query_count_does_not_grow_with_orders(client, make_hotel, make_order, url):
+    hotel_id = make_hotel()
+    counts, placed = {}, 0
+    for total in (1, 25):
+        for _ in range(total - placed):
+            make_order(hotel_id, 101 if placed % 2 else 102)
+            placed += 1
+        with count_queries() as statements:
+            response = client.get(url)
+        assert response.status_code == 200
+        orders = response.json()
+        assert len(orders) == total
+        assert all(order["items"] == ["Eggs x2", "Tea x1"] for order in orders)
+        counts[total] = len(statements)
+    assert counts[1] == counts[25]
+
+def test_room_orders_query_count_does_not_grow_with_orders(client, make_hotel, make_order):
+    hotel_id = make_hotel()
+    counts, placed = {}, 0
+    for total in (1, 25):
+        for _ in range(total - placed):
+            make_order(hotel_id, 101)
+            placed += 1
+        with count_queries() as statements:
+            response = client.get("/business/room-orders/101")
+        assert response.status_code == 200
+        assert len(response.json()["orders"]) == total
+        counts[total] = len(statements)
+    assert counts[1] == counts[25]
@@ -0,0 +1,24 @@
+"""Frozen month snapshots of the Parquet export pick up orders completed after the month closed"""
+import io
+from datetime import date, datetime
+import pytest
+import parquet_export
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+def exported_order_ids(hotel_id: int) -> list:
+    content = b"".join(parquet_export.parquet_chunks(hotel_id, "orders", date(2024, 3, 1), date(2024, 3, 31)))
+    return pq.read_table(io.BytesIO(content)).column("order_id").to_pylist()
+
+def test_late_completion_rewrites_the_month_snapshot(client, make_hotel, make_order, monkeypatch, tmp_path):
+    monkeypatch.setattr(parquet_export, "ANALYTICS_SNAPSHOT_DIR", str(tmp_path))
+    hotel_id = make_hotel()
+    early = make_order(hotel_id, 101, created_at=datetime(2024, 3, 5, 8, 0), status="completed")
+    late = make_order(hotel_id, 102, created_at=datetime(2024, 3, 30, 21, 0))
+
+    # March is long closed: the first export freezes it with only the completed order
+    assert exported_order_ids(hotel_id) == [early]
+    assert (tmp_path / f"v{parquet_export.SNAPSHOT_VERSION}" / f"hotel_{hotel_id}" / "orders" / "2024-03.parquet").exists()
+
+    assert client.post(f"/business/complete-order/{late}").status_code == 200
+    assert exported_order_ids(hotel_id) == [early, late]
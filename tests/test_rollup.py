@@ -0,0 +1,29 @@
+"""Daily rollup writes: one row per (hotel, day, staff, category), NULL staff and category included"""
+from datetime import datetime
+from sqlalchemy import text
+from models import DailyRollup
+from rollup import add_orders_to_rollup, rebuild_daily_rollup
+
+def test_completions_on_the_same_day_add_up_in_one_row_per_key(db, make_hotel, make_order):
+    hotel_id = make_hotel()
+    created_at = datetime(2025, 7, 10, 9, 30)
+    order_ids = [make_order(hotel_id, 101, items={"Eggs": 1, "Tea": 2}, created_at=created_at, tip_amount=1.5)
+                 for _ in range(3)]
+    db.execute(text("UPDATE tablelink_orders SET status = 'completed'"))
+    # One completion at a time, as the checkout routes fold them in
+    for order_id in order_ids:
+        add_orders_to_rollup(db, [order_id])
+    db.commit()
+
+    rows = {row.category: row for row in db.query(DailyRollup).all()}
+    assert sorted(rows, key=str) == ["Breakfast", "Drinks", None]
+    assert (rows[None].order_count, rows[None].quantity, rows[None].revenue) == (3, 9, 54.0)
+    assert rows[None].tips == 4.5
+    assert (rows["Drinks"].order_count, rows["Drinks"].quantity) == (3, 6)
+
+    # The backfill produces the same rows
+    incremental = {category: (row.quantity, row.revenue, row.order_count) for category, row in rows.items()}
+    rebuild_daily_rollup(db, hotel_id)
+    db.expire_all()
+    rebuilt = {row.category: (row.quantity, row.revenue, row.order_count) for row in db.query(DailyRollup).all()}
+    assert rebuilt == incremental
@@ -0,0 +1,17 @@
+"""SQLITE_PROFILE selection: a misspelt profile stops startup instead of silently using defaults"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlite_profile import apply_sqlite_profile, sqlite_pragmas
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError, match="SQLITE_PROFILE 'tunned'"):
+        sqlite_pragmas("tunned")
+    with pytest.raises(ValueError):
+        apply_sqlite_profile(create_engine("sqlite://"), "tunned")
+
+def test_tuned_profile_switches_to_wal(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_profile(engine, "tuned")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    engine.dispose()